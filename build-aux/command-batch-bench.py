@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+# command-batch-bench.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Startup command batching benchmark.
+
+Applies the post-init commands a new window sends to mpv, once one
+synchronous command at a time (as before) and once through
+utils.command_batch(), and reports the median time of each. For the
+whole startup, compare the "mpv configured" phase of --startup-trace.
+
+    build-aux/command-batch-bench.py --runs 20
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+COMMANDS = [
+    ("set", "vo", "libmpv"),
+    ("set", "osc", "no"),
+    ("set", "load-console", "no"),
+    ("change-list", "watch-later-options", "remove", "vid"),
+    ("change-list", "watch-later-options", "remove", "aid"),
+    ("change-list", "watch-later-options", "remove", "volume"),
+    ("change-list", "watch-later-options", "remove", "sub-scale"),
+    ("change-list", "watch-later-options", "remove", "ab-loop-a"),
+    ("change-list", "watch-later-options", "remove", "ab-loop-b"),
+    ("set", "sub-color", "#ebebeb"),
+    ("set", "sub-scale", "1.0"),
+    ("set", "sub-font", "Adwaita Sans SemiBold"),
+    ("set", "slang", "eng,en"),
+    ("set", "alang", "eng,en"),
+    ("set", "volume", "100"),
+    ("set", "save-position-on-quit", "yes"),
+    ("set", "sub-border-style", "outline-and-shadow"),
+    ("set", "sub-shadow-offset", "0.6"),
+    ("set", "sub-back-color", "#97000000"),
+    ("set", "sub-border-color", "#97000000"),
+    ("set", "hwdec", "auto"),
+    ("af", "add", "@cine_loudnorm:lavfi=[loudnorm=I=-20]"),
+    ("set", "loop-playlist", "inf"),
+]
+
+
+def load_cine():
+    """Import the source tree as the `cine` package."""
+    spec = importlib.util.spec_from_file_location(
+        "cine",
+        os.path.join(SRC_DIR, "__init__.py"),
+        submodule_search_locations=[SRC_DIR],
+    )
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["cine"] = module
+    spec.loader.exec_module(module)
+
+
+def new_player(mpv):
+    return mpv.MPV(vo="null", ao="null", config=False, load_scripts=False)
+
+
+def run_sequential(player):
+    for args in COMMANDS:
+        player.command(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mpv startup command batching")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    load_cine()
+    import mpv
+
+    from cine.utils import command_batch
+
+    results = {"sequential": [], "batched": []}
+    for _ in range(args.runs):
+        for name, apply in (
+            ("sequential", run_sequential),
+            ("batched", lambda p: command_batch(p, COMMANDS)),
+        ):
+            player = new_player(mpv)
+            start = time.perf_counter()
+            apply(player)
+            results[name].append(time.perf_counter() - start)
+            player.terminate()
+
+    seq = statistics.median(results["sequential"]) * 1000
+    batch = statistics.median(results["batched"]) * 1000
+    print(f"{len(COMMANDS)} commands, median of {args.runs} runs")
+    print(f"sequential {seq:8.2f} ms")
+    print(f"batched    {batch:8.2f} ms")
+    print(f"saved      {seq - batch:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+# render-bench.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Headless render benchmark for VideoGLArea.
+
+Plays a generated lavfi clip through VideoGLArea and reports render call
+throughput and latency percentiles, once with GraphicsOffload disabled and
+once enabled.
+
+GTK needs a display, so unless WAYLAND_DISPLAY is already set, a headless
+Weston is started (surfaceless EGL with software Mesa), which works on CI
+machines without a GPU.
+
+    build-aux/render-bench.py --seconds 10 --size 1920x1080 --rate 60
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[idx]
+
+
+def load_cine():
+    """Import the source tree as the `cine` package."""
+    spec = importlib.util.spec_from_file_location(
+        "cine",
+        os.path.join(SRC_DIR, "__init__.py"),
+        submodule_search_locations=[SRC_DIR],
+    )
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["cine"] = module
+    spec.loader.exec_module(module)
+
+
+def run_child(args):
+    """Runs inside the compositor session, prints one JSON result line."""
+    os.environ.setdefault("GSK_RENDERER", "gl")
+
+    import gi
+
+    gi.require_version("GLib", "2.0")
+    gi.require_version("Gtk", "4.0")
+    from gi.repository import GLib, Gtk
+
+    load_cine()
+    import mpv
+
+    from cine.mpv_gl_area import VideoGLArea
+
+    width, height = (int(v) for v in args.size.split("x"))
+
+    player = mpv.MPV(
+        vo="libmpv",
+        ao="null",
+        audio="no",
+        hwdec="no",
+        config=False,
+        load_scripts=False,
+        terminal=False,
+        keep_open=True,
+        loop_file="inf",
+        untimed=args.untimed,
+    )
+
+    area = VideoGLArea(player)
+    offload = Gtk.GraphicsOffload(child=area)
+    offload.set_black_background(True)
+    offload.set_enabled(
+        Gtk.GraphicsOffloadEnabled.ENABLED
+        if args.offload == "on"
+        else Gtk.GraphicsOffloadEnabled.DISABLED
+    )
+
+    win = Gtk.Window(default_width=width, default_height=height, child=offload)
+    win.present()
+
+    player.loadfile(
+        f"av://lavfi:testsrc2=size={args.size}:rate={args.rate}", "replace"
+    )
+
+    loop = GLib.MainLoop()
+    result = {}
+
+    def start_measuring():
+        area.render_times = []
+        result["start"] = time.perf_counter()
+        result["drops"] = player.frame_drop_count or 0
+        GLib.timeout_add(int(args.seconds * 1000), stop_measuring)
+        return GLib.SOURCE_REMOVE
+
+    def stop_measuring():
+        elapsed = time.perf_counter() - result["start"]
+        times = area.render_times or []
+        ms = [t * 1000 for t in times]
+        print(
+            json.dumps(
+                {
+                    "offload": args.offload,
+                    "renders": len(times),
+                    "elapsed": elapsed,
+                    "renders_per_sec": len(times) / elapsed if elapsed else 0.0,
+                    "p50_ms": percentile(ms, 50),
+                    "p90_ms": percentile(ms, 90),
+                    "p99_ms": percentile(ms, 99),
+                    "max_ms": max(ms, default=0.0),
+                    "frame_drops": (player.frame_drop_count or 0) - result["drops"],
+                }
+            ),
+            flush=True,
+        )
+        loop.quit()
+        return GLib.SOURCE_REMOVE
+
+    GLib.timeout_add(int(args.warmup * 1000), start_measuring)
+    loop.run()
+
+    player.terminate()
+    return 0
+
+
+def start_compositor(args, env):
+    runtime_dir = env.setdefault("XDG_RUNTIME_DIR", tempfile.mkdtemp())
+    socket = f"cine-bench-{os.getpid()}"
+    weston = shutil.which("weston")
+    if not weston:
+        sys.exit("weston not found, install it or run inside an existing session")
+
+    comp_env = dict(env, LIBGL_ALWAYS_SOFTWARE="1", EGL_PLATFORM="surfaceless")
+    proc = subprocess.Popen(
+        [
+            weston,
+            "--backend=headless",
+            "--renderer=gl",
+            f"--width={args.size.split('x')[0]}",
+            f"--height={args.size.split('x')[1]}",
+            f"--socket={socket}",
+            "--idle-time=0",
+        ],
+        env=comp_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    socket_path = os.path.join(runtime_dir, socket)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            sys.exit("Failed to start headless weston")
+        time.sleep(0.05)
+
+    env["WAYLAND_DISPLAY"] = socket
+    return proc
+
+
+def run_parent(args):
+    env = dict(os.environ)
+    env["GDK_BACKEND"] = "wayland"
+    env["LIBGL_ALWAYS_SOFTWARE"] = "1"
+    env["GSK_RENDERER"] = "gl"
+    # keep the user config dir untouched
+    env["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="cine-bench-")
+
+    compositor = None
+    if not env.get("WAYLAND_DISPLAY"):
+        compositor = start_compositor(args, env)
+
+    results = []
+    try:
+        for offload in ("off", "on"):
+            cmd = [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--child",
+                f"--offload={offload}",
+                f"--seconds={args.seconds}",
+                f"--warmup={args.warmup}",
+                f"--size={args.size}",
+                f"--rate={args.rate}",
+            ]
+            if not args.untimed:
+                cmd.append("--timed")
+
+            out = subprocess.run(
+                cmd, env=env, capture_output=True, text=True, timeout=120
+            )
+            lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+            if out.returncode != 0 or not lines:
+                sys.stderr.write(out.stderr)
+                return 1
+            results.append(json.loads(lines[-1]))
+    finally:
+        if compositor:
+            compositor.terminate()
+            compositor.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(
+        f"{'offload':<8}{'renders':>9}{'per sec':>10}"
+        f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'drops':>7}"
+    )
+    for r in results:
+        print(
+            f"{r['offload']:<8}{r['renders']:>9}{r['renders_per_sec']:>10.1f}"
+            f"{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+            f"{r['max_ms']:>9.2f}{r['frame_drops']:>7}"
+        )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VideoGLArea render benchmark")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--rate", type=int, default=60)
+    parser.add_argument(
+        "--timed",
+        dest="untimed",
+        action="store_false",
+        help="render at the clip rate instead of as fast as possible",
+    )
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--offload", choices=("on", "off"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    return run_child(args) if args.child else run_parent(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
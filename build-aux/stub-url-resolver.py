@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# stub-url-resolver.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Stand-in for yt-dlp when trying URL resolution ahead of playback.
+
+Prints yt-dlp -J style JSON that points every URL at one target, after
+an optional delay, so the prefetch can be seen without network access:
+
+    export CINE_URL_RESOLVER="build-aux/stub-url-resolver.py --delay 3 \\
+        --target http://127.0.0.1:8765/video.mkv"
+    cine https://example.com/a https://example.com/b
+"""
+
+import argparse
+import json
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub URL resolver")
+    parser.add_argument("--target", required=True, help="stream URL to return")
+    parser.add_argument("--delay", type=float, default=0, help="seconds to wait")
+    parser.add_argument("--expires-in", type=int, default=600)
+    parser.add_argument("--fail", action="store_true", help="exit with an error")
+    parser.add_argument("url")
+    args = parser.parse_args()
+
+    time.sleep(args.delay)
+    if args.fail:
+        return 1
+
+    expire = int(time.time()) + args.expires_in
+    sep = "&" if "?" in args.target else "?"
+    json.dump(
+        {
+            "_type": "video",
+            "title": f"Stub {args.url.rsplit('/', 1)[-1]}",
+            "url": f"{args.target}{sep}expire={expire}",
+            "http_headers": {"User-Agent": "cine-stub"},
+        },
+        sys.stdout,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# throttled-http-server.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Throttled HTTP server for trying the stream cache policy.
+
+Serves one file with Range support at a limited rate, with optional
+stalls, so underruns and readahead changes can be watched in Cine:
+
+    build-aux/throttled-http-server.py video.mkv --rate 800 --stall-every 20
+    cine http://127.0.0.1:8765/video.mkv
+"""
+
+import argparse
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHUNK = 16 * 1024
+
+
+def make_handler(args):
+    size = os.path.getsize(args.file)
+    name = "/" + os.path.basename(args.file)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_HEAD(self):
+            self._serve(head=True)
+
+        def do_GET(self):
+            self._serve(head=False)
+
+        def _serve(self, head):
+            if self.path.split("?", 1)[0] != name:
+                self.send_error(404)
+                return
+
+            start, end = 0, size - 1
+            ranged = self.headers.get("Range", "").startswith("bytes=")
+            if ranged:
+                first, _, last = self.headers["Range"][6:].partition("-")
+                start = int(first or 0)
+                end = min(int(last), size - 1) if last else size - 1
+                if start >= size:
+                    self.send_error(416)
+                    return
+
+            self.send_response(206 if ranged else 200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start + 1))
+            if ranged:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if head:
+                return
+
+            rate = args.rate * 1024
+            began = time.monotonic()
+            next_stall = began + args.stall_every if args.stall_every else None
+            sent = 0
+            try:
+                with open(args.file, "rb") as f:
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        data = f.read(min(CHUNK, remaining))
+                        if not data:
+                            break
+                        self.wfile.write(data)
+                        sent += len(data)
+                        remaining -= len(data)
+
+                        now = time.monotonic()
+                        if next_stall and now >= next_stall:
+                            time.sleep(args.stall_for)
+                            next_stall = time.monotonic() + args.stall_every
+                            began += args.stall_for
+                        ahead = sent / rate - (time.monotonic() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, fmt, *log_args):
+            if args.verbose:
+                super().log_message(fmt, *log_args)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throttled HTTP file server")
+    parser.add_argument("file")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=1024, help="KiB/s")
+    parser.add_argument(
+        "--stall-every", type=float, default=0, help="seconds between stalls"
+    )
+    parser.add_argument("--stall-for", type=float, default=5, help="stall seconds")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args))
+    print(f"http://127.0.0.1:{args.port}/{os.path.basename(args.file)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
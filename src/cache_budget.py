@@ -0,0 +1,144 @@
+# cache_budget.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+
+import mpv
+
+from .utils import timeout_add_once
+
+logger = logging.getLogger(__name__)
+
+MiB = 1024 * 1024
+
+# demuxer cache shared by all windows, forward and back together
+BUDGET_BYTES = 512 * MiB
+# part of each share kept for seeking back
+BACK_FRACTION = 0.25
+MIN_BYTES = 4 * MiB
+# coalesces focus and pause changes of several windows
+REBALANCE_MS = 250
+
+FOCUSED = "focused"
+PLAYING = "playing"
+PAUSED = "paused"
+BACKGROUND = "background"
+
+WEIGHTS = {FOCUSED: 8, PLAYING: 4, PAUSED: 2, BACKGROUND: 1}
+
+
+class CacheBudget:
+    """
+    Splits one demuxer cache budget between the windows by priority,
+    scaled by what the source type of each needs (see cache_policy).
+    A window never gets more than the limits it started with, so a single
+    window keeps the mpv.conf (or default) values.
+    """
+
+    def __init__(self, budget=BUDGET_BYTES):
+        self.budget = budget
+        # window -> (max bytes, max back bytes) it started with
+        self._caps: dict = {}
+        self._applied: dict = {}
+        self._rebalance_id = 0
+
+    def add(self, win):
+        try:
+            fwd = int(win.mpv["demuxer-max-bytes"])
+            back = int(win.mpv["demuxer-max-back-bytes"])
+        except (mpv.ShutdownError, TypeError, ValueError):
+            return
+        self._caps[win] = (fwd, back)
+        self.update()
+
+    def remove(self, win):
+        self._caps.pop(win, None)
+        self._applied.pop(win, None)
+        self.update()
+
+    def update(self, *args):
+        """Rebalances soon, call it when focus or playback state changes."""
+        if not self._rebalance_id:
+            self._rebalance_id = timeout_add_once(REBALANCE_MS, self._rebalance)
+
+    def limits(self, win):
+        """Demuxer max bytes and max back bytes last given to the window."""
+        return self._applied.get(win)
+
+    def _priority(self, win):
+        try:
+            if win.mpv.idle_active:
+                return BACKGROUND
+            paused = win.mpv.pause
+        except mpv.ShutdownError:
+            return BACKGROUND
+
+        if win.props.is_active:
+            return FOCUSED
+        if not win.get_mapped() or win.is_suspended():
+            return BACKGROUND
+        return PAUSED if paused else PLAYING
+
+    def _rebalance(self):
+        self._rebalance_id = 0
+        if not self._caps:
+            return
+
+        weights = {
+            win: WEIGHTS[self._priority(win)] * win.cache_policy.budget_factor
+            for win in self._caps
+        }
+        total_weight = sum(weights.values())
+
+        for win, weight in weights.items():
+            share = self.budget * weight / total_weight
+            cap_fwd, cap_back = self._caps[win]
+            fwd = int(min(cap_fwd, max(MIN_BYTES, share * (1 - BACK_FRACTION))))
+            back = int(min(cap_back, max(MIN_BYTES, share * BACK_FRACTION)))
+
+            if self._applied.get(win) == (fwd, back):
+                continue
+            self._applied[win] = (fwd, back)
+            try:
+                win.mpv.command_async("set", "demuxer-max-bytes", str(fwd))
+                win.mpv.command_async("set", "demuxer-max-back-bytes", str(back))
+            except mpv.ShutdownError:
+                continue
+            win.preload.update()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            _per_window, total = self.usage()
+            logger.debug(
+                f"Demuxer cache limits: {self._applied},"
+                f" in use: {total // MiB} MiB of {self.budget // MiB} MiB"
+            )
+
+    def usage(self):
+        """
+        Cached bytes per window from demuxer-cache-state,
+        and the total of all windows.
+        """
+        per_window = {}
+        for win in self._caps:
+            try:
+                state = win.mpv.demuxer_cache_state or {}
+            except mpv.ShutdownError:
+                continue
+            per_window[win] = int(state.get("total-bytes", 0))
+        return per_window, sum(per_window.values())
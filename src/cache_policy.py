@@ -0,0 +1,221 @@
+# cache_policy.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import time
+
+import gi
+import mpv
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gio, GLib
+
+from .utils import idle_add_once, is_local_path
+
+logger = logging.getLogger(__name__)
+
+LOCAL = "local"
+LAN = "lan"
+HTTP = "http"
+SEGMENTED = "segmented"  # HLS/DASH
+
+LAN_SCHEMES = ("smb", "nfs", "sftp", "ftp", "dav", "davs")
+SEGMENTED_FORMATS = ("hls", "dash")
+SEGMENTED_EXTS = (".m3u8", ".mpd")
+
+# seconds buffered before resuming after an underrun to start with,
+# the most it can grow to, and the part of the window's demuxer cache budget
+# it may use. Network sources keep mpv's cache-secs, which only the byte
+# budget bounds, local files keep the mpv.conf (or default) pause wait.
+PROFILES = {
+    LOCAL: (None, None, 0.25),
+    LAN: (1, 5, 1.0),
+    HTTP: (2, 15, 1.0),
+    SEGMENTED: (2, 10, 1.0),
+}
+
+# local files don't need more readahead than this, it's only ever lowered
+LOCAL_READAHEAD_SECONDS = 10
+
+# the pause wait grows by this on each underrun, and shrinks back the same way
+GROW = 1.5
+# no underruns for this long, with a link much faster than the bitrate, shrinks it
+SHRINK_AFTER_SECONDS = 30
+FAST_LINK_FACTOR = 8
+# stalls right after a seek or a restart are a refill, not an underrun
+SEEK_GRACE_SECONDS = 3
+
+
+def classify_url(path, file_format, via_network):
+    """Source type from what mpv knows after loading."""
+    if not via_network and is_local_path(path):
+        return LOCAL
+
+    scheme = path.split("://", 1)[0].lower() if "://" in path else ""
+    if scheme in LAN_SCHEMES:
+        return LAN
+    if any(fmt in (file_format or "") for fmt in SEGMENTED_FORMATS):
+        return SEGMENTED
+    if path.lower().split("?", 1)[0].endswith(SEGMENTED_EXTS):
+        return SEGMENTED
+    return HTTP
+
+
+class CachePolicy:
+    """
+    Picks the cache settings of each loaded file by source type
+    and adapts them to underruns and the observed cache speed.
+    """
+
+    def __init__(self, win):
+        self._win = win
+        self._mpv: mpv.MPV = win.mpv
+        self.source_type = LOCAL
+        self.pause_wait = None
+        self.underruns = 0
+        self._last_underrun = 0.0
+        self._seeking = False
+        self._last_restart = 0.0
+        self._cancellable: Gio.Cancellable | None = None
+
+        try:
+            self._defaults = (
+                self._mpv["cache-secs"],
+                self._mpv["cache-pause-wait"],
+            )
+        except mpv.ShutdownError:
+            self._defaults = (None, None)
+
+        @self._mpv.event_callback("file-loaded")
+        def on_file_loaded(_event):
+            idle_add_once(self._on_file_loaded)
+
+        @self._mpv.event_callback("seek")
+        def on_seek(_event):
+            self._seeking = True
+
+        @self._mpv.event_callback("playback-restart")
+        def on_playback_restart(_event):
+            self._seeking = False
+            self._last_restart = time.monotonic()
+
+        @self._mpv.property_observer("paused-for-cache")
+        def on_paused_for_cache(_name, paused):
+            if paused:
+                idle_add_once(self._on_underrun)
+
+        @self._mpv.property_observer("cache-speed")
+        def on_cache_speed(_name, speed):
+            if speed and self.source_type != LOCAL:
+                idle_add_once(self._on_cache_speed, speed)
+
+    @property
+    def budget_factor(self):
+        return PROFILES[self.source_type][2]
+
+    def _on_file_loaded(self):
+        try:
+            path = self._mpv.path or ""
+            source_type = classify_url(
+                path, self._mpv.file_format, self._mpv.demuxer_via_network
+            )
+        except mpv.ShutdownError:
+            return
+
+        if self._cancellable:
+            self._cancellable.cancel()
+            self._cancellable = None
+
+        if source_type == LOCAL and path:
+            # mounted shares look like local paths
+            self._cancellable = Gio.Cancellable()
+            Gio.File.new_for_commandline_arg(path).query_filesystem_info_async(
+                Gio.FILE_ATTRIBUTE_FILESYSTEM_REMOTE,
+                GLib.PRIORITY_DEFAULT,
+                self._cancellable,
+                self._on_fs_info,
+            )
+
+        self._set_source_type(source_type)
+
+    def _on_fs_info(self, gfile, result):
+        try:
+            info = gfile.query_filesystem_info_finish(result)
+        except GLib.Error:
+            return
+        self._cancellable = None
+        if info.get_attribute_boolean(Gio.FILE_ATTRIBUTE_FILESYSTEM_REMOTE):
+            self._set_source_type(LAN)
+
+    def _set_source_type(self, source_type):
+        self.source_type = source_type
+        self.underruns = 0
+        self._last_underrun = time.monotonic()
+
+        cache_secs = self._defaults[0]
+        if source_type == LOCAL and cache_secs is not None:
+            cache_secs = min(cache_secs, LOCAL_READAHEAD_SECONDS)
+        try:
+            if cache_secs is not None:
+                self._mpv.command_async("set", "cache-secs", str(cache_secs))
+        except mpv.ShutdownError:
+            pass
+
+        self._apply(PROFILES[source_type][0])
+        self._win.app.cache_budget.update()
+
+    def _apply(self, pause_wait):
+        self.pause_wait = pause_wait
+        if pause_wait is None:
+            pause_wait = self._defaults[1]
+        try:
+            if pause_wait is not None:
+                self._mpv.command_async("set", "cache-pause-wait", str(pause_wait))
+        except mpv.ShutdownError:
+            pass
+
+    def _on_underrun(self):
+        if self.pause_wait is None:
+            return
+        if self._seeking or time.monotonic() - self._last_restart < SEEK_GRACE_SECONDS:
+            return
+        self.underruns += 1
+        self._last_underrun = time.monotonic()
+
+        most = PROFILES[self.source_type][1]
+        if self.pause_wait < most:
+            self._apply(min(most, round(self.pause_wait * GROW, 1)))
+            logger.info(f"Cache underrun, pause wait now {self.pause_wait}s")
+
+    def _on_cache_speed(self, speed):
+        base = PROFILES[self.source_type][0]
+        pause_wait = self.pause_wait
+        if base is None or pause_wait is None or pause_wait <= base:
+            return
+        if time.monotonic() - self._last_underrun < SHRINK_AFTER_SECONDS:
+            return
+
+        try:
+            bitrate = (self._mpv.video_bitrate or 0) + (self._mpv.audio_bitrate or 0)
+        except mpv.ShutdownError:
+            return
+        if bitrate and speed > bitrate / 8 * FAST_LINK_FACTOR:
+            self._last_underrun = time.monotonic()
+            self._apply(max(base, round(pause_wait / GROW, 1)))
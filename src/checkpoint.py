@@ -0,0 +1,288 @@
+# checkpoint.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+import gi
+import mpv
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from .playlist_io import obj_entry
+from .save_session import read_playlist, write_playlist
+from .utils import PLAYLIST_DIR, idle_add_once, timeout_add_seconds_once
+
+logger = logging.getLogger(__name__)
+
+# files are keyed per window, so instances don't remove each other's
+CHECKPOINT_FILE = os.path.join(PLAYLIST_DIR, "checkpoint-{}.m3u8")
+# held while its window is open, a checkpoint nobody holds was left by a crash
+LOCK_FILE = os.path.join(PLAYLIST_DIR, "checkpoint-{}.lock")
+# one journal per checkpoint, so a crash mid-compaction can't mix them up
+JOURNAL_FILE = os.path.join(PLAYLIST_DIR, "checkpoint-{}-{}.jsonl")
+GEN_MARKER = "#CINE-CHECKPOINT:"
+
+CHECKPOINT_SECONDS = 10
+# journal records before it's compacted into a new checkpoint file
+COMPACT_RECORDS = 500
+
+
+# checkpoints of crashed windows being restored, with their lock
+_adopted: dict[str, int] = {}
+
+
+def _lock(key):
+    """Locked file descriptor of a checkpoint, None if someone else holds it."""
+    try:
+        fd = os.open(LOCK_FILE.format(key), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def _remove_checkpoint(key, lock_fd):
+    journals = glob.glob(JOURNAL_FILE.format(glob.escape(key), "*"))
+    for file in [CHECKPOINT_FILE.format(key), *journals, LOCK_FILE.format(key)]:
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.exception("Failed to remove session checkpoint")
+    if lock_fd is not None:
+        os.close(lock_fd)
+
+
+def find_checkpoint():
+    """
+    Key of the newest checkpoint left behind when a window didn't close
+    cleanly, None if there's none. Older ones left behind are removed.
+    """
+    found = None
+    paths = sorted(glob.glob(CHECKPOINT_FILE.format("*")), key=_mtime, reverse=True)
+    for path in paths:
+        key = os.path.basename(path).removeprefix("checkpoint-")
+        key = key.removesuffix(".m3u8")
+        fd = _lock(key)
+        if fd is None:
+            continue  # still open in another instance
+        if found is None and os.path.exists(path):
+            found = key
+            _adopted[key] = fd
+        else:
+            _remove_checkpoint(key, fd)
+    return found
+
+
+def release_adopted():
+    """Removes restored checkpoints, once they're saved elsewhere."""
+    while _adopted:
+        _remove_checkpoint(*_adopted.popitem())
+
+
+def read_checkpoint(key):
+    """Checkpoint items with the journal replayed: (items, pos, start_time)."""
+    checkpoint_file = CHECKPOINT_FILE.format(key)
+    items, pos = read_playlist(checkpoint_file)
+    start_time = None
+    gen = None
+
+    with open(checkpoint_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith(GEN_MARKER):
+                gen = int(line.removeprefix(GEN_MARKER))
+                break
+            if not line.startswith("#"):
+                break
+
+    if gen is None:
+        return items, pos, start_time
+
+    try:
+        with open(JOURNAL_FILE.format(key, gen), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn last line, written when it crashed
+
+                if record["op"] == "splice":
+                    start = record["start"]
+                    added = [tuple(entry) for entry in record["add"]]
+                    items[start : start + record["remove"]] = added
+                elif record["op"] == "pos":
+                    pos, start_time = record["index"], record["time"]
+    except FileNotFoundError:
+        pass
+
+    return items, pos, start_time
+
+
+class SessionCheckpointer:
+    """
+    Journals queue edits and the playback position of a window as small
+    appended records, so the session survives a crash. The journal is
+    compacted into the checkpoint playlist once it grows, and both files
+    are removed on a clean close, along with a restored crashed session.
+    """
+
+    def __init__(self, window):
+        self._win = window
+        self._lock = threading.Lock()
+        self._journal = None
+        self._gen = int(time.time() * 1000)
+        self._key = f"{os.getpid()}-{self._gen}"
+        self._lock_fd = _lock(self._key)
+        self._records = 0
+        self._pending: list[str] | None = None
+        self._ready = False
+        self._closed = False
+        self._last_pos = None
+        self._tick_id = timeout_add_seconds_once(CHECKPOINT_SECONDS, self._tick)
+
+    def record_splice(self, start, removed, added):
+        """Called by the window for each playlist model splice."""
+        if not self._ready and self._pending is None:
+            return  # the first checkpoint has the whole playlist
+
+        add = [obj_entry(obj) for obj in added]
+        self._append(
+            {"op": "splice", "start": start, "remove": len(removed), "add": add}
+        )
+
+    def _append(self, record):
+        line = json.dumps(record) + "\n"
+
+        if self._pending is not None:
+            self._pending.append(line)
+            return
+
+        if self._journal is None:
+            return
+
+        try:
+            # flushed to the kernel, that's enough to survive the process dying
+            self._journal.write(line)
+            self._journal.flush()
+            self._records += 1
+        except OSError:
+            logger.exception("Failed to write session journal")
+
+    def _tick(self):
+        self._tick_id = 0
+        player = self._win.mpv
+
+        try:
+            # the model lags behind mpv until bulk loads are done
+            busy = player.idle_active or self._win.bulk_loading
+            if not busy and self._pending is None:
+                if not self._ready or self._records >= COMPACT_RECORDS:
+                    self._compact()
+                elif not player.pause:
+                    pos = (player.playlist_pos, round(player.time_pos or 0, 1))
+                    if pos != self._last_pos:
+                        self._last_pos = pos
+                        self._append({"op": "pos", "index": pos[0], "time": pos[1]})
+        except mpv.ShutdownError:
+            return
+
+        self._tick_id = timeout_add_seconds_once(CHECKPOINT_SECONDS, self._tick)
+
+    def _compact(self):
+        player = self._win.mpv
+        self._win.flush_playlist()
+
+        items = [obj_entry(obj) for obj in self._win.playlist_objs]
+        pos = player.playlist_pos or 0
+        self._last_pos = (pos, round(player.time_pos or 0, 1))
+
+        # records made while it's written go to the new journal
+        self._pending = [
+            json.dumps({"op": "pos", "index": pos, "time": self._last_pos[1]}) + "\n"
+        ]
+        self._gen += 1
+        threading.Thread(
+            target=self._write_checkpoint, args=(items, pos, self._gen), daemon=True
+        ).start()
+
+    def _write_checkpoint(self, items, pos, gen):
+        with self._lock:
+            if self._closed:
+                return
+            write_playlist(
+                items, pos, CHECKPOINT_FILE.format(self._key), [f"{GEN_MARKER}{gen}"]
+            )
+        idle_add_once(self._on_compacted, gen)
+
+    def _on_compacted(self, gen):
+        pending, self._pending = self._pending or [], None
+        if self._closed:
+            return
+
+        try:
+            if self._journal:
+                self._journal.close()
+                os.remove(JOURNAL_FILE.format(self._key, gen - 1))
+            self._journal = open(
+                JOURNAL_FILE.format(self._key, gen), "w", encoding="utf-8"
+            )
+            self._journal.writelines(pending)
+            self._journal.flush()
+            self._records = len(pending)
+            self._ready = True
+        except OSError:
+            logger.exception("Failed to write session journal")
+            return
+        # this checkpoint has the restored session now
+        release_adopted()
+
+    def close(self):
+        """Clean close, the saved session is used on the next start."""
+        if self._tick_id:
+            GLib.source_remove(self._tick_id)
+            self._tick_id = 0
+
+        with self._lock:
+            self._closed = True
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+
+            _remove_checkpoint(self._key, self._lock_fd)
+            self._lock_fd = None
+            release_adopted()
@@ -0,0 +1,192 @@
+# drop_loader.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+from gettext import gettext as _
+
+import gi
+import mpv
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gio, GLib
+
+from .utils import SUB_EXTS, is_local_path
+
+logger = logging.getLogger(__name__)
+
+QUERY_ATTRS = "standard::content-type,standard::type"
+PLAYABLE_TYPES = ("video/", "audio/", "image/")
+
+# file queries running at once
+MAX_QUERIES = 16
+# playable items sent to mpv per loadlist
+DROP_BATCH = 500
+# items classified between progress updates
+PROGRESS_STEP = 100
+
+PLAY = "play"
+SUB = "sub"
+
+
+class DropLoader:
+    """
+    Classifies dropped items with async file queries, a few at a time.
+    The first playable item is loaded as soon as it is known, the rest is
+    appended in batches, keeping the drop order.
+    """
+
+    def __init__(self, window, items, first_mode="replace", spinner=None):
+        self._win = window
+        self._spinner = spinner or window.spinner
+        self._items = items
+        # (kind, path) once classified, kind is None for skipped items
+        self._results: list[tuple[str | None, str] | None] = [None] * len(items)
+        self._next_query = 0
+        self._next_flush = 0
+        self._running = 0
+        self._mode = first_mode
+        self._batch: list[str] = []
+        self._added = 0
+        self._shown = 0
+        self._failed = False
+        self._cancellable = Gio.Cancellable()
+        self.done = False
+
+    def start(self):
+        self._win.cancel_restore()
+        self._spinner.set_visible(True)
+        self._query_more()
+
+    def cancel(self):
+        self.done = True
+        self._cancellable.cancel()
+
+    def _query_more(self):
+        while self._running < MAX_QUERIES and self._next_query < len(self._items):
+            idx = self._next_query
+            self._next_query += 1
+            item = self._items[idx]
+
+            if isinstance(item, str):  # URL string
+                self._results[idx] = (PLAY, item)
+                continue
+
+            path = item.get_path() or item.get_uri()
+            if not is_local_path(path):
+                self._results[idx] = (PLAY, path)
+                continue
+
+            if (item.get_basename() or "").lower().endswith(SUB_EXTS):
+                self._results[idx] = (SUB, path)
+                continue
+
+            self._running += 1
+            item.query_info_async(
+                QUERY_ATTRS,
+                Gio.FileQueryInfoFlags.NONE,
+                GLib.PRIORITY_DEFAULT,
+                self._cancellable,
+                self._on_info,
+                (idx, path),
+            )
+
+        self._flush()
+
+    def _on_info(self, item, result, data):
+        self._running -= 1
+        if self.done:
+            return
+
+        idx, path = data
+        kind = None
+        try:
+            info = item.query_info_finish(result)
+            mime = info.get_content_type() or ""
+            if info.get_file_type() == Gio.FileType.DIRECTORY or mime.startswith(
+                PLAYABLE_TYPES
+            ):
+                kind = PLAY
+        except GLib.Error as e:
+            logger.warning(f"Drop query failed for {path}: {e}")
+            if not self._failed:
+                self._failed = True
+                self._win.show_toast(e.message)
+
+        self._results[idx] = (kind, path)
+        self._query_more()
+
+    def _flush(self):
+        """Hands the classified items to mpv, in drop order."""
+        n_items = len(self._items)
+        try:
+            while self._next_flush < n_items:
+                result = self._results[self._next_flush]
+                if result is None:
+                    break
+                self._results[self._next_flush] = None
+                self._next_flush += 1
+
+                kind, path = result
+                if kind == SUB:
+                    if not self._win.mpv.idle_active:
+                        self._win.mpv.command_async("sub-add", path, "select")
+                elif kind == PLAY:
+                    self._add(path)
+
+            finished = self._next_flush == n_items
+            if self._batch and (finished or len(self._batch) >= DROP_BATCH):
+                self._send()
+
+            if finished:
+                self._finish()
+            elif self._next_flush - self._shown >= PROGRESS_STEP:
+                self._shown = self._next_flush
+                self._spinner.set_visible(True)
+                self._win.mpv.show_text(
+                    _("Adding Files") + f": {self._next_flush}/{n_items}"
+                )
+        except mpv.ShutdownError:
+            self.cancel()
+
+    def _add(self, path):
+        if self._added == 0:
+            # the first item plays right away
+            self._win.load_path(path, self._mode)
+            if self._mode == "replace":
+                self._win.mpv.command_async("set", "pause", "no")
+        else:
+            self._batch.append(path)
+        self._added += 1
+
+    def _send(self):
+        self._win.enqueue(self._batch, "append-play")
+        self._batch = []
+
+    def _finish(self):
+        self.done = True
+        if self._shown:
+            self._win.mpv.show_text(_("Adding Files") + f": {len(self._items)}")
+        if (
+            self._spinner is not self._win.spinner
+            or self._win.mpv.time_pos is not None
+            or not self._added
+        ):
+            self._spinner.set_visible(False)
+        self._win.on_drop_loaded(self)
@@ -17,9 +17,9 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import gc
 import logging
 import os
-import subprocess
 import sys
 from gettext import gettext as _
 from typing import cast
@@ -32,9 +32,12 @@ gi.require_version("GLib", "2.0")
 gi.require_version("Gtk", "4.0")
 from gi.repository import Adw, Gio, GLib, Gtk
 
+from . import startup_trace
 from .mpris import MPRIS
-from .preferences import Preferences, settings
+from .mpv_pool import MpvPool
+from .queue_service import QueueService
 from .save_session import is_same_playlist
+from .settings import settings
 from .window import CineWindow
 
 logger = logging.getLogger(__name__)
@@ -48,12 +51,18 @@ os.environ["PIPEWIRE_PROPS"] = '{application.icon-name="io.github.diegopvlk.Cine
 class CineApplication(Adw.Application):
     """The main application singleton class."""
 
-    def __init__(self):
+    def __init__(self, isolated=False):
+        flags = Gio.ApplicationFlags.HANDLES_OPEN
+        if isolated:
+            # a worker with one window, the primary instance owns the app id
+            flags |= Gio.ApplicationFlags.NON_UNIQUE
+
         super().__init__(
             application_id="io.github.diegopvlk.Cine",
-            flags=Gio.ApplicationFlags.HANDLES_OPEN,
+            flags=flags,
             resource_base_path="/io/github/diegopvlk/Cine",
         )
+        self.isolated = isolated
 
         self.add_main_option(
             "new-window",
@@ -64,10 +73,75 @@ class CineApplication(Adw.Application):
             None,
         )
 
+        self.add_main_option(
+            "startup-trace",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.NONE,
+            "Print startup timings until the first frame",
+            None,
+        )
+
+        self.add_main_option(
+            "watchdog",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.INT,
+            "Log main loop stalls longer than MS milliseconds",
+            "MS",
+        )
+
+        self.add_main_option(
+            "isolated",
+            0,
+            GLib.OptionFlags.HIDDEN,
+            GLib.OptionArg.NONE,
+            "Run as a separate window process",
+            None,
+        )
+
+        self.watchdog = None
+        self._media_index = None
+        self._url_resolver = None
         self.connect("shutdown", self._on_shutdown)
 
+    @property
+    def media_index(self):
+        """Started on first use, with the first local file."""
+        if self._media_index is None:
+            from .media_index import MediaIndex
+
+            self._media_index = MediaIndex()
+        return self._media_index
+
+    @property
+    def url_resolver(self):
+        """Started on first use, with the first web URL."""
+        if self._url_resolver is None:
+            from .url_resolver import UrlResolver
+
+            self._url_resolver = UrlResolver()
+        return self._url_resolver
+
+    def do_dbus_register(self, connection, object_path):
+        try:
+            self.queue_service = QueueService(self, connection, object_path)
+        except Exception:
+            logger.exception("Queue D-Bus interface failed")
+        return Adw.Application.do_dbus_register(self, connection, object_path)
+
+    def do_dbus_unregister(self, connection, object_path):
+        if queue_service := getattr(self, "queue_service", None):
+            queue_service.unregister()
+        Adw.Application.do_dbus_unregister(self, connection, object_path)
+
     def do_startup(self):
+        from .cache_budget import CacheBudget
+
         self.mpris = MPRIS(self)
+        # a window process only ever has its one window
+        self.mpv_pool = MpvPool(warm=not self.isolated)
+        self.cache_budget = CacheBudget()
 
         Adw.Application.do_startup(self)
         Adw.StyleManager.get_default().props.color_scheme = Adw.ColorScheme.FORCE_DARK
@@ -79,14 +153,28 @@ class CineApplication(Adw.Application):
             "preferences", self.on_preferences_action, ["<primary>comma"]
         )
 
+        self._held = False
+        if not self.isolated:
+            settings.connect("changed::run-in-background", self._on_run_in_bg_changed)
+            self._on_run_in_bg_changed()
+            self.connect("window-removed", self._on_window_removed)
+
+        startup_trace.mark("application startup")
+
     def do_activate(self):
         win = CineWindow(application=self, is_activate=True)
+        startup_trace.mark("window created")
         win.present()
+        startup_trace.trace_first_frame(win)
 
     def do_open(self, files, n_files, hint):
         win: CineWindow = cast(CineWindow, self.props.active_window)
         open_new = settings.get_boolean("open-new-windows") or not win
 
+        isolate = settings.get_boolean("isolate-windows") and not self.isolated
+        if open_new and isolate and self._spawn_isolated(files):
+            return
+
         if open_new:
             win = CineWindow(application=self)
             win.start_page.set_visible(False)
@@ -98,58 +186,28 @@ class CineApplication(Adw.Application):
                 if first_video_path:
                     break
 
+            info = None
             if first_video_path:
-                try:
-                    cmd = [
-                        "ffprobe",
-                        "-v",
-                        "error",
-                        "-select_streams",
-                        "v:0",
-                        "-show_entries",
-                        "stream=width,height:stream_side_data=rotation",
-                        "-of",
-                        "csv=s=x:p=0",
-                        first_video_path,
-                    ]
-                    output = subprocess.check_output(
-                        cmd, text=True, timeout=2, stderr=subprocess.DEVNULL
-                    ).strip()
-
-                    if output:
-                        # "1920x1080x-90" or just "1920x1080"
-                        parts = output.splitlines()[0].split("x")
-
-                        width = int(parts[0])
-                        height = int(parts[1])
-
-                        try:
-                            rotation = int(parts[2]) if len(parts) > 2 else 0
-                        except Exception:
-                            logger.exception("Failed to get rotation")
-                            rotation = 0
-
-                        if abs(rotation) in (90, 270):
-                            w = height
-                            h = width
-                        else:
-                            w = width
-                            h = height
-
-                        win.set_window_size(w, h)
-                except Exception:
-                    logger.exception("Metadata probe failed")
+                info = self.media_index.get(first_video_path)
+
+            if info and info.get("width") and info.get("height"):
+                w, h = info["width"], info["height"]
+                if abs(info.get("rotation", 0)) in (90, 270):
+                    w, h = h, w
+                win.set_window_size(w, h)
+
+            startup_trace.mark("window created")
             win.present()
+            startup_trace.trace_first_frame(win)
         else:
             win.present()
-            if is_same_playlist(win.mpv.playlist):
+            win.cancel_restore()
+            if is_same_playlist(win):
                 win.mpv.write_watch_later_config()
             win.mpv.stop()
 
-        for gfile in files:
-            path = gfile.get_path() or gfile.get_uri()
-            if path:
-                win.mpv.loadfile(path, "append-play")
+        paths = [gfile.get_path() or gfile.get_uri() for gfile in files]
+        win.enqueue([path for path in paths if path], "append-play")
 
         for window in self.get_windows():
             w = cast(CineWindow, window)
@@ -158,6 +216,42 @@ class CineApplication(Adw.Application):
 
         win.hide_ui_timeout()
 
+    def _spawn_isolated(self, files):
+        """Opens the files in a new process, each with its own GIL and mpv."""
+        argv = [sys.executable, sys.argv[0], "--isolated"]
+        if startup_trace.enabled:
+            argv.append("--startup-trace")
+        if self.watchdog:
+            argv.append(f"--watchdog={round(self.watchdog.threshold * 1000)}")
+        argv += ["--", *(gfile.get_uri() for gfile in files)]
+        try:
+            proc = Gio.Subprocess.new(argv, Gio.SubprocessFlags.NONE)
+        except GLib.Error:
+            logger.exception("Failed to start window process")
+            return False
+
+        # stays alive for D-Bus activation while workers run
+        self.hold()
+        proc.wait_async(None, self._on_isolated_exit, proc.get_identifier())
+        return True
+
+    def _on_isolated_exit(self, proc, result, pid):
+        self.release()
+        try:
+            proc.wait_finish(result)
+        except GLib.Error:
+            return
+        if proc.get_successful():
+            return
+
+        if proc.get_if_signaled():
+            reason = f"signal {proc.get_term_sig()}"
+        else:
+            reason = f"status {proc.get_exit_status()}"
+        logger.warning(f"Window process {pid} exited with {reason}")
+        if win := self.props.active_window:
+            cast(CineWindow, win).show_toast(_("A window closed unexpectedly"))
+
     def find_first_file(self, gfile, visited=None):
         """Local-only recursive search."""
         if gfile.get_uri_scheme() != "file":
@@ -211,6 +305,7 @@ class CineApplication(Adw.Application):
     # From showtime
     def do_handle_local_options(self, options: GLib.VariantDict):
         """Handle local command line arguments."""
+        startup_trace.enabled = options.contains("startup-trace")
         self.register()  # This is so props.is_remote works
 
         if self.props.is_remote:
@@ -220,10 +315,19 @@ class CineApplication(Adw.Application):
             print("Cine is running, to open a new window, run with --new-window.")
             return 0
 
+        if options.contains("watchdog"):
+            from .watchdog import Watchdog
+
+            threshold = options.lookup_value("watchdog", GLib.VariantType("i"))
+            self.watchdog = Watchdog(max(1, threshold.get_int32()))
+            self.watchdog.start()
+
         return -1
 
     def on_preferences_action(self, *args):
         """Callback for the app.preferences action."""
+        from .preferences import Preferences
+
         preferences = Preferences(self.props.active_window)
         preferences.present(self.props.active_window)
 
@@ -289,12 +393,33 @@ class CineApplication(Adw.Application):
         if shortcuts:
             self.set_accels_for_action(f"app.{name}", shortcuts)
 
+    def _on_run_in_bg_changed(self, *args):
+        """Keeps the process alive with no windows, opening files is faster."""
+        run_in_bg = settings.get_boolean("run-in-background")
+        if run_in_bg and not self._held:
+            self.hold()
+            self.mpv_pool.schedule_warm()
+        elif not run_in_bg and self._held:
+            self.release()
+        self._held = run_in_bg
+
+    def _on_window_removed(self, _app, _win):
+        if self._held and not self.get_windows():
+            # players of closed windows are gone, only the spare stays
+            gc.collect()
+            self.mpv_pool.schedule_warm()
+
     def _on_shutdown(self, *args):
+        if self.watchdog:
+            self.watchdog.stop()
         for win in self.get_windows():
             win.close()
+        self.mpv_pool.shutdown()
+        if self._media_index:
+            self._media_index.save()
 
 
 def main(version):
     """The application's entry point."""
-    app = CineApplication()
+    app = CineApplication(isolated="--isolated" in sys.argv)
     return app.run(sys.argv)
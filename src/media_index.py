@@ -0,0 +1,263 @@
+# media_index.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import fcntl
+import itertools
+import json
+import logging
+import os
+import queue
+import stat
+import subprocess
+import threading
+
+from .utils import CACHE_DIR, format_time, idle_add_once, timeout_add_seconds_once
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = os.path.join(CACHE_DIR, "media-info.json")
+# window processes share the cache file, saves are merged under this lock
+LOCK_FILE = os.path.join(CACHE_DIR, "media-info.lock")
+
+WORKERS = 2
+MAX_ENTRIES = 50_000
+SAVE_DELAY_SECONDS = 10
+
+# visible rows and the window being opened go first
+PRIORITY_NOW = 0
+PRIORITY_BACKGROUND = 1
+
+
+def probe(path, timeout=5):
+    """Duration, resolution, rotation, codecs and title of a local file."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration:format_tags=title"
+        ":stream=codec_type,codec_name,width,height"
+        ":stream_disposition=attached_pic:stream_side_data=rotation",
+        "-of",
+        "json",
+        path,
+    ]
+    output = subprocess.check_output(
+        cmd, text=True, timeout=timeout, stderr=subprocess.DEVNULL
+    )
+    data = json.loads(output or "{}")
+    fmt = data.get("format", {})
+
+    info = {
+        "duration": float(fmt.get("duration") or 0) or None,
+        "title": fmt.get("tags", {}).get("title"),
+    }
+
+    for stream in data.get("streams", []):
+        codec_type = stream.get("codec_type")
+        if codec_type == "video" and "vcodec" not in info:
+            if stream.get("disposition", {}).get("attached_pic"):
+                continue
+            info["vcodec"] = stream.get("codec_name")
+            info["width"] = stream.get("width")
+            info["height"] = stream.get("height")
+            for side_data in stream.get("side_data_list", []):
+                if "rotation" in side_data:
+                    info["rotation"] = int(side_data["rotation"])
+        elif codec_type == "audio" and "acodec" not in info:
+            info["acodec"] = stream.get("codec_name")
+
+    return info
+
+
+def _identity(path):
+    """(size, mtime) of a regular file, None for folders and others."""
+    st = os.stat(path)
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def format_details(info):
+    """Row subtitle like "1:23:45 · 1920×1080 · h264/aac"."""
+    parts = []
+    if duration := info.get("duration"):
+        parts.append(format_time(duration))
+
+    width, height = info.get("width"), info.get("height")
+    if width and height:
+        if abs(info.get("rotation", 0)) in (90, 270):
+            width, height = height, width
+        parts.append(f"{width}×{height}")
+
+    codecs = [c for c in (info.get("vcodec"), info.get("acodec")) if c]
+    if codecs:
+        parts.append("/".join(codecs))
+
+    return " · ".join(parts)
+
+
+class MediaIndex:
+    """
+    Probes local files with ffprobe on worker threads and keeps the results
+    in a cache persisted in the user cache dir, keyed by path and checked
+    against the file size and mtime. Saving merges the entries probed here
+    into the file, so other processes' entries are kept.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: dict[str, list] = {}
+        self._loaded = threading.Event()
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._callbacks: dict[str, list] = {}
+        self._queued: dict[str, int] = {}
+        self._save_id = 0
+        self._changed: set[str] = set()
+
+        threading.Thread(target=self._load, daemon=True).start()
+        for _ in range(WORKERS):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _load(self):
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            with self._lock:
+                self._cache = {**cache, **self._cache}
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.exception("Failed to read media info cache")
+        finally:
+            self._loaded.set()
+
+    def lookup(self, path):
+        """Cached info without checking the file, None if there's none."""
+        entry = self._cache.get(path)
+        return entry[2] if entry else None
+
+    def get(self, path, timeout=2):
+        """Blocking version of request(), probes right away if not cached."""
+        self._loaded.wait(0.25)
+        try:
+            ident = _identity(path)
+            if ident is None:
+                return None
+
+            entry = self._cache.get(path)
+            if entry and tuple(entry[:2]) == ident:
+                return entry[2]
+
+            info = probe(path, timeout)
+            self._store(path, ident, info)
+            return info
+        except Exception:
+            logger.exception("Metadata probe failed")
+            return None
+
+    def request(self, path, callback, priority=PRIORITY_BACKGROUND):
+        """callback(info) runs on the main thread once the file is checked."""
+        with self._lock:
+            self._callbacks.setdefault(path, []).append(callback)
+            queued = self._queued.get(path)
+            if queued is not None and queued <= priority:
+                return
+            self._queued[path] = priority
+        self._queue.put((priority, next(self._seq), path))
+
+    def _work(self):
+        self._loaded.wait()
+        while True:
+            priority, _seq, path = self._queue.get()
+            with self._lock:
+                if self._queued.get(path) != priority:
+                    continue  # requeued with a higher priority
+                del self._queued[path]
+
+            info = None
+            try:
+                ident = _identity(path)
+                entry = self._cache.get(path)
+                if ident is None:
+                    pass
+                elif entry and tuple(entry[:2]) == ident:
+                    info = entry[2]
+                else:
+                    info = probe(path)
+                    self._store(path, ident, info)
+            except Exception as e:
+                logger.warning(f"Metadata probe failed for {path}: {e}")
+
+            with self._lock:
+                callbacks = self._callbacks.pop(path, [])
+            if info:
+                for callback in callbacks:
+                    idle_add_once(callback, info)
+
+    def _store(self, path, ident, info):
+        with self._lock:
+            self._cache.pop(path, None)
+            self._cache[path] = [*ident, info]
+            while len(self._cache) > MAX_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+            self._changed.add(path)
+        idle_add_once(self._schedule_save)
+
+    def _schedule_save(self):
+        if not self._save_id:
+            self._save_id = timeout_add_seconds_once(
+                SAVE_DELAY_SECONDS, self._save_async
+            )
+
+    def _save_async(self):
+        self._save_id = 0
+        threading.Thread(target=self.save, daemon=True).start()
+
+    def save(self):
+        with self._lock:
+            if not self._changed:
+                return
+            changed = {p: self._cache[p] for p in self._changed if p in self._cache}
+            self._changed.clear()
+            cache = dict(self._cache)
+
+        tmp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(LOCK_FILE, "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                        cache = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    pass
+
+                for path, entry in changed.items():
+                    cache.pop(path, None)
+                    cache[path] = entry
+                while len(cache) > MAX_ENTRIES:
+                    del cache[next(iter(cache))]
+
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(cache, f)
+                os.replace(tmp_file, CACHE_FILE)
+        except Exception:
+            logger.exception("Failed to save media info cache")
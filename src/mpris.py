@@ -18,6 +18,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
+import os
 from gettext import gettext as _
 
 import gi
@@ -28,14 +29,26 @@ gi.require_version("Gio", "2.0")
 gi.require_version("GLib", "2.0")
 from gi.repository import Adw, Gio, GLib
 
-from .utils import idle_add_once
+from .utils import idle_add_once, is_local_path, timeout_add_once
 
 logger = logging.getLogger(__name__)
 
 APP_ID = "io.github.diegopvlk.Cine"
 MEDIAPLAYER2_PLAYER = "org.mpris.MediaPlayer2.Player"
+MEDIAPLAYER2_TRACKLIST = "org.mpris.MediaPlayer2.TrackList"
+TRACK_PATH = "/io/github/diegopvlk/Cine/Track/"
+NO_TRACK = "/org/mpris/MediaPlayer2/TrackList/NoTrack"
+
+# bigger playlist changes send TrackListReplaced instead of one signal per track
+TRACKLIST_REPLACE_LIMIT = 200
+
+# some gnome extensions can spam properties which can cause frame drops,
+# so changes are coalesced and only the ones that differ are sent
+PROPS_FLUSH_MS = 50
+
+# time-pos jumps bigger than this are reported as Seeked
+SEEK_THRESHOLD_USEC = 500_000
 
-# some gnome extensions can spam properties which can cause frame drops
 INTERFACE = """
 <!DOCTYPE node PUBLIC
 '-//freedesktop//DTD D-BUS Object Introspection 1.0//EN'
@@ -82,6 +95,40 @@ INTERFACE = """
         <property name='CanControl' type='b' access='read'/>
         <property name='Shuffle' type='b' access='readwrite'/>
     </interface>
+    <interface name='org.mpris.MediaPlayer2.TrackList'>
+        <method name='GetTracksMetadata'>
+            <arg direction='in' name='TrackIds' type='ao'/>
+            <arg direction='out' name='Metadata' type='aa{sv}'/>
+        </method>
+        <method name='AddTrack'>
+            <arg direction='in' name='Uri' type='s'/>
+            <arg direction='in' name='AfterTrack' type='o'/>
+            <arg direction='in' name='SetAsCurrent' type='b'/>
+        </method>
+        <method name='RemoveTrack'>
+            <arg direction='in' name='TrackId' type='o'/>
+        </method>
+        <method name='GoTo'>
+            <arg direction='in' name='TrackId' type='o'/>
+        </method>
+        <signal name='TrackListReplaced'>
+            <arg name='Tracks' type='ao'/>
+            <arg name='CurrentTrack' type='o'/>
+        </signal>
+        <signal name='TrackAdded'>
+            <arg name='Metadata' type='a{sv}'/>
+            <arg name='AfterTrack' type='o'/>
+        </signal>
+        <signal name='TrackRemoved'>
+            <arg name='TrackId' type='o'/>
+        </signal>
+        <signal name='TrackMetadataChanged'>
+            <arg name='TrackId' type='o'/>
+            <arg name='Metadata' type='a{sv}'/>
+        </signal>
+        <property name='Tracks' type='ao' access='read'/>
+        <property name='CanEditTracks' type='b' access='read'/>
+    </interface>
 </node>
 """
 
@@ -90,12 +137,32 @@ class MPRIS:
     def __init__(self, app: Adw.Application) -> None:
         self._app = app
         self._bus_name = f"org.mpris.MediaPlayer2.{APP_ID}"
+        if app.isolated:  # type: ignore
+            # one player per process, as the spec allows
+            self._bus_name += f".instance{os.getpid()}"
         self._path = "/org/mpris/MediaPlayer2"
         self._con = None
+        self._emitted_props: dict[str, GLib.Variant] = {}
+        self._pending_props: dict[str, GLib.Variant] = {}
+        self._refresh_pending = False
+        self._flush_id = 0
+
+        # Local clock for Position, so D-Bus polls don't have to read mpv
+        self._pos_usec = 0
+        self._pos_mono = 0
+        self._rate = 1.0
+        self._paused = True
+        # stopped while idle, between files and buffering
+        self._running = False
+        self._pos_resync = True
+
+        # TrackList metadata of the active window, by mpv playlist entry id
+        self._track_meta: dict[int, dict[str, GLib.Variant]] = {}
 
         Gio.bus_get(Gio.BusType.SESSION, None, self._on_bus_acquired)
 
         self._app.connect("notify::active-window", self.update_props)
+        self._app.connect("notify::active-window", self._on_active_window_changed)
 
     def _on_bus_acquired(self, _source, res):
         def register():
@@ -123,51 +190,84 @@ class MPRIS:
         idle_add_once(register)
 
     def _emit_props_changed(self, changed_props):
+        """Queues changed properties, they are sent together on the next flush."""
+        self._pending_props.update(changed_props)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_id:
+            self._flush_id = timeout_add_once(PROPS_FLUSH_MS, self._flush_props)
+
+    def _flush_props(self):
+        self._flush_id = 0
+
+        if self._refresh_pending:
+            self._refresh_pending = False
+            try:
+                self._pending_props.update(self._read_player_props())
+            except mpv.ShutdownError:
+                pass
+
+        pending, self._pending_props = self._pending_props, {}
+
         if not self._con:
             return
 
+        changed = {
+            key: value
+            for key, value in pending.items()
+            if key not in self._emitted_props
+            or not self._emitted_props[key].equal(value)
+        }
+
+        if not changed:
+            return
+
+        self._emitted_props.update(changed)
         self._con.emit_signal(
             None,
             self._path,
             "org.freedesktop.DBus.Properties",
             "PropertiesChanged",
-            GLib.Variant("(sa{sv}as)", (MEDIAPLAYER2_PLAYER, changed_props, [])),
+            GLib.Variant("(sa{sv}as)", (MEDIAPLAYER2_PLAYER, changed, [])),
         )
 
     def update_props(self, *args):
-        """Notifies D-Bus that properties have changed."""
-        if not self._con:
-            return
-
-        self._emit_props_changed(
-            {
-                "Identity": GLib.Variant("s", _("Cine")),
-                "DesktopEntry": GLib.Variant("s", APP_ID),
-            },
-        )
-
-        if self._mpv:
-            status = "Paused" if self._mpv.pause else "Playing"
-            vol = self._mpv.volume
-            loop = self._get_loop_status()
-
-            self._emit_props_changed(
-                {
-                    "PlaybackStatus": GLib.Variant("s", status),
-                    "LoopStatus": GLib.Variant("s", loop),
-                    "Metadata": self._get_metadata_variant()
-                    if not self._mpv.idle_active
-                    else GLib.Variant("a{sv}", {}),
-                    "CanPlay": GLib.Variant("b", True),
-                    "CanPause": GLib.Variant("b", True),
-                    "CanSeek": GLib.Variant("b", True),
-                    "CanControl": GLib.Variant("b", True),
-                    "Volume": GLib.Variant("d", float(vol / 100.0)),
-                    "CanGoPrevious": GLib.Variant("b", self._can_go_prev),
-                    "CanGoNext": GLib.Variant("b", self._can_go_next),
-                    "Shuffle": GLib.Variant("b", self._shuffle),
-                },
-            )
+        """Notifies D-Bus that properties have changed.
+
+        mpv is only read once per flush, no matter how often this is called.
+        """
+        self._refresh_pending = True
+        self._schedule_flush()
+
+    def _read_player_props(self):
+        if not self._mpv:
+            return {}
+
+        self._paused = bool(self._mpv.pause)
+        self._rate = float(self._mpv.speed or 1)
+        self._running = not (self._mpv.idle_active or self._mpv.paused_for_cache)
+        self._set_clock(int(float(self._mpv.time_pos or 0) * 1_000_000))
+
+        status = "Paused" if self._paused else "Playing"
+        vol = self._mpv.volume
+        loop = self._get_loop_status()
+
+        return {
+            "PlaybackStatus": GLib.Variant("s", status),
+            "LoopStatus": GLib.Variant("s", loop),
+            "Metadata": self._get_metadata_variant()
+            if not self._mpv.idle_active
+            else GLib.Variant("a{sv}", {}),
+            "CanPlay": GLib.Variant("b", True),
+            "CanPause": GLib.Variant("b", True),
+            "CanSeek": GLib.Variant("b", True),
+            "CanControl": GLib.Variant("b", True),
+            "Volume": GLib.Variant("d", float(vol / 100.0)),
+            "CanGoPrevious": GLib.Variant("b", self._can_go_prev),
+            "CanGoNext": GLib.Variant("b", self._can_go_next),
+            "Shuffle": GLib.Variant("b", self._shuffle),
+        }
 
     @property
     def _mpv(self):
@@ -208,7 +308,56 @@ class MPRIS:
 
         return "None"
 
-    def update_playback_status(self, paused):
+    def _position(self):
+        if self._paused or not self._running:
+            return self._pos_usec
+        elapsed = GLib.get_monotonic_time() - self._pos_mono
+        return self._pos_usec + int(elapsed * self._rate)
+
+    def _set_clock(self, pos_usec):
+        self._pos_usec = pos_usec
+        self._pos_mono = GLib.get_monotonic_time()
+
+    def _is_active(self, win):
+        return win == self._app.props.active_window
+
+    def update_position(self, win, time_pos):
+        """Rebases the local clock, emits Seeked if time-pos jumped."""
+        if not self._is_active(win):
+            return
+
+        pos_usec = int(time_pos * 1_000_000)
+        jumped = abs(pos_usec - self._position()) > SEEK_THRESHOLD_USEC
+        self._set_clock(pos_usec)
+
+        if self._pos_resync:
+            self._pos_resync = False
+        elif jumped:
+            self._emit_seeked(pos_usec)
+
+    def set_clock_running(self, win, running):
+        """Freezes the clock where it is, or starts it from there."""
+        if not self._is_active(win):
+            return
+        try:
+            # a cache pause can end after the playlist did
+            running = running and not win.mpv.idle_active
+        except mpv.ShutdownError:
+            return
+        self._set_clock(self._position())
+        self._running = running
+
+    def update_rate(self, win, speed):
+        if not self._is_active(win):
+            return
+        self._set_clock(self._position())
+        self._rate = speed
+
+    def update_playback_status(self, win, paused):
+        if not self._is_active(win):
+            return
+        self._set_clock(self._position())
+        self._paused = paused
         status = "Paused" if paused else "Playing"
         self._emit_props_changed({"PlaybackStatus": GLib.Variant("s", status)})
 
@@ -217,6 +366,8 @@ class MPRIS:
         self._emit_props_changed({"Volume": GLib.Variant("d", float(vol))})
 
     def update_metadata(self):
+        # new file, time-pos going back to the start is not a seek
+        self._pos_resync = True
         metadata = self._get_metadata_variant()
         self._emit_props_changed({"Metadata": metadata})
 
@@ -225,8 +376,12 @@ class MPRIS:
         self._emit_props_changed({"LoopStatus": GLib.Variant("s", current_loop)})
 
     def update_can_prev_next(self, can_prev, can_next):
-        self._emit_props_changed({"CanGoPrevious": GLib.Variant("b", can_prev)})
-        self._emit_props_changed({"CanGoNext": GLib.Variant("b", can_next)})
+        self._emit_props_changed(
+            {
+                "CanGoPrevious": GLib.Variant("b", can_prev),
+                "CanGoNext": GLib.Variant("b", can_next),
+            }
+        )
 
     def update_shuffle(self, shuffle_active):
         self._emit_props_changed({"Shuffle": GLib.Variant("b", shuffle_active)})
@@ -241,12 +396,20 @@ class MPRIS:
             if duration is None:
                 duration = 0
 
+            win = self._app.props.active_window
+            objs = getattr(win, "playlist_objs", [])
+            pos = getattr(self._mpv, "playlist_pos", -1)
+            track_id = (
+                self._track_path(objs[pos].entry_id)
+                if pos is not None and 0 <= pos < len(objs)
+                else NO_TRACK
+            )
+
             metadata = {
-                "mpris:trackid": GLib.Variant("o", "/org/mpris/MediaPlayer2/Track/0"),
+                "mpris:trackid": GLib.Variant("o", track_id),
                 "mpris:length": GLib.Variant("x", int(duration * 1_000_000)),
             }
 
-            win = self._app.props.active_window
             window_title = win.props.title if win else None
             title = window_title or getattr(self._mpv, "media_title", None)
 
@@ -262,9 +425,109 @@ class MPRIS:
 
         return GLib.Variant("a{sv}", metadata)
 
+    def _track_path(self, entry_id):
+        return f"{TRACK_PATH}{entry_id}"
+
+    def _track_paths(self):
+        win = self._app.props.active_window
+        objs = getattr(win, "playlist_objs", [])
+        return [self._track_path(obj.entry_id) for obj in objs]
+
+    def _track_obj(self, track_path):
+        if not track_path.startswith(TRACK_PATH):
+            return None
+        win = self._app.props.active_window
+        try:
+            entry_id = int(track_path.removeprefix(TRACK_PATH))
+            return getattr(win, "playlist_by_id", {}).get(entry_id)
+        except ValueError:
+            return None
+
+    def _track_metadata(self, obj):
+        """Metadata of a playlist item, cached until the item is removed."""
+        metadata = self._track_meta.get(obj.entry_id)
+        if metadata is not None:
+            return metadata
+
+        path = obj.item.get("filename", "")
+        title = obj.item.get("title") or os.path.splitext(os.path.basename(path))[0]
+        url = path
+
+        if is_local_path(path) and os.path.isabs(path):
+            try:
+                url = GLib.filename_to_uri(path)
+            except GLib.Error:
+                pass
+
+        metadata = {
+            "mpris:trackid": GLib.Variant("o", self._track_path(obj.entry_id)),
+            "xesam:url": GLib.Variant("s", url),
+            "xesam:title": GLib.Variant("s", title or path),
+        }
+        self._track_meta[obj.entry_id] = metadata
+        return metadata
+
+    def _get_tracks_metadata(self, track_paths):
+        """Only the requested tracks are built, so clients can page through."""
+        tracks = []
+        for track_path in track_paths:
+            if obj := self._track_obj(track_path):
+                tracks.append(self._track_metadata(obj))
+        return GLib.Variant("(aa{sv})", (tracks,))
+
+    def _emit_tracklist_signal(self, name, variant):
+        if self._con:
+            self._con.emit_signal(
+                None, self._path, MEDIAPLAYER2_TRACKLIST, name, variant
+            )
+
+    def _emit_tracklist_replaced(self):
+        self._track_meta.clear()
+        current = NO_TRACK
+        if playing := getattr(self._app.props.active_window, "_playing_obj", None):
+            current = self._track_path(playing.entry_id)
+        self._emit_tracklist_signal(
+            "TrackListReplaced", GLib.Variant("(aoo)", (self._track_paths(), current))
+        )
+
+    def _on_active_window_changed(self, *args):
+        self._emit_tracklist_replaced()
+
+    def update_tracks(self, win, position, removed, added):
+        """Sends the items that changed in a window playlist model."""
+        if not self._is_active(win):
+            return
+
+        for obj in removed:
+            self._track_meta.pop(obj.entry_id, None)
+
+        if len(removed) + len(added) > TRACKLIST_REPLACE_LIMIT:
+            self._emit_tracklist_replaced()
+            return
+
+        for obj in removed:
+            self._emit_tracklist_signal(
+                "TrackRemoved", GLib.Variant("(o)", (self._track_path(obj.entry_id),))
+            )
+
+        after = NO_TRACK
+        if position > 0:
+            after = self._track_path(win.playlist_objs[position - 1].entry_id)
+
+        for obj in added:
+            self._emit_tracklist_signal(
+                "TrackAdded", GLib.Variant("(a{sv}o)", (self._track_metadata(obj), after))
+            )
+            after = self._track_path(obj.entry_id)
+
     def _on_method_call(
         self, _con, _sender, _path, interface, method, params, invocation
     ):
+        if method == "GetTracksMetadata":
+            track_ids = params.unpack()[0]
+            invocation.return_value(self._get_tracks_metadata(track_ids))
+            return
+
         idle_add_once(self._handle_method, method, params)
         invocation.return_value(None)
 
@@ -293,13 +556,28 @@ class MPRIS:
                 self.update_props()
             elif method == "Seek":
                 offset_usec = params.get_child_value(0).get_int64()
-                current_pos = getattr(p, "time_pos", 0)
-                p.time_pos = current_pos + (offset_usec / 1_000_000.0)
-                self.emit_seeked()
+                pos_usec = max(0, self._position() + offset_usec)
+                p.time_pos = pos_usec / 1_000_000.0
+                self._set_clock(pos_usec)
+                self._emit_seeked(pos_usec)
             elif method == "SetPosition":
                 pos_usec = params.get_child_value(1).get_int64()
                 p.time_pos = pos_usec / 1_000_000.0
-                self.emit_seeked()
+                self._set_clock(pos_usec)
+                self._emit_seeked(pos_usec)
+            elif method == "GoTo":
+                if obj := self._track_obj(params.unpack()[0]):
+                    p.playlist_pos = obj.position
+            elif method == "RemoveTrack":
+                if obj := self._track_obj(params.unpack()[0]):
+                    p.command("playlist-remove", obj.position)
+            elif method == "AddTrack":
+                uri, after_track, set_as_current = params.unpack()
+                after_obj = self._track_obj(after_track)
+                index = after_obj.position + 1 if after_obj else 0
+                p.loadfile(uri, "insert-at", index)
+                if set_as_current:
+                    p.playlist_pos = index
             elif method == "Raise":
                 win = self._app.props.active_window
                 if win:
@@ -309,23 +587,17 @@ class MPRIS:
         except mpv.ShutdownError:
             pass
 
-    def emit_seeked(self):
-        try:
-            if not self._con or not self._mpv:
-                return
-            raw_pos = getattr(self._mpv, "time_pos", 0)
-            if raw_pos is None:
-                raw_pos = 0
-            pos_usec = int(raw_pos * 1_000_000)
-            self._con.emit_signal(
-                None,
-                self._path,
-                MEDIAPLAYER2_PLAYER,
-                "Seeked",
-                GLib.Variant("(x)", (pos_usec,)),
-            )
-        except mpv.ShutdownError:
-            pass
+    def _emit_seeked(self, pos_usec):
+        if not self._con:
+            return
+
+        self._con.emit_signal(
+            None,
+            self._path,
+            MEDIAPLAYER2_PLAYER,
+            "Seeked",
+            GLib.Variant("(x)", (pos_usec,)),
+        )
 
     def _on_get_property(self, _con, _sender, _path, interface, prop):
         try:
@@ -347,16 +619,18 @@ class MPRIS:
                 elif prop == "LoopStatus":
                     return GLib.Variant("s", self._get_loop_status())
                 elif prop == "Position":
-                    raw_pos = getattr(p, "time_pos", 0)
-                    if raw_pos is None:
-                        raw_pos = 0
-                    pos = int(raw_pos * 1_000_000)
-                    return GLib.Variant("x", pos)
+                    return GLib.Variant("x", self._position() if p else 0)
                 elif prop == "Metadata":
                     return self._get_metadata_variant()
                 elif prop == "Shuffle":
                     return GLib.Variant("b", self._shuffle)
 
+            elif interface == MEDIAPLAYER2_TRACKLIST:
+                if prop == "Tracks":
+                    return GLib.Variant("ao", self._track_paths())
+                elif prop == "CanEditTracks":
+                    return GLib.Variant("b", True)
+
             elif interface == "org.mpris.MediaPlayer2":
                 if prop == "Identity":
                     return GLib.Variant("s", _("Cine"))
@@ -365,7 +639,7 @@ class MPRIS:
                 elif prop in ["CanQuit", "CanRaise"]:
                     return GLib.Variant("b", True)
                 elif prop == "HasTrackList":
-                    return GLib.Variant("b", False)
+                    return GLib.Variant("b", True)
                 elif prop in ["SupportedUriSchemes", "SupportedMimeTypes"]:
                     return GLib.Variant("as", [])
         except mpv.ShutdownError:
@@ -18,6 +18,7 @@
 
 import ctypes
 import logging
+import time
 
 import gi
 import mpv
@@ -48,6 +49,8 @@ class BaseGLArea(Gtk.GLArea):
         super().__init__(**kwargs)
         self._ctx: mpv.MpvRenderContext | None = None
         self._fbo = ctypes.c_int()
+        # Set to a list to collect render call durations (see build-aux/render-bench.py)
+        self.render_times: list[float] | None = None
         self.connect("realize", self._on_realize)
         self.connect("render", self._on_render)
 
@@ -78,6 +81,7 @@ class BaseGLArea(Gtk.GLArea):
         try:
             glGetIntegerv(GL_FRAMEBUFFER_BINDING, self._fbo)
             assert self._ctx is not None
+            start = time.perf_counter() if self.render_times is not None else 0.0
             self._ctx.render(
                 flip_y=True,
                 opengl_fbo={
@@ -86,6 +90,8 @@ class BaseGLArea(Gtk.GLArea):
                     "fbo": self._fbo.value,
                 },
             )
+            if self.render_times is not None:
+                self.render_times.append(time.perf_counter() - start)
         except Exception:
             logger.exception("ThumbPreviewGLArea _on_render failed")
 
@@ -0,0 +1,199 @@
+# mpv_pool.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import os
+import threading
+from gettext import gettext as _
+
+import mpv
+
+from .shortcuts import INTERNAL_BINDINGS
+from .resolver_hook import hook_script
+from .utils import (
+    CONFIG_DIR,
+    INPUT_CONF,
+    MPV_CONF,
+    SCREENSHOT_DIR,
+    WATCH_HISTORY_JSONL,
+    command_batch,
+    ensure_config_files,
+    timeout_add_seconds_once,
+)
+
+logger = logging.getLogger(__name__)
+
+# wait a bit before warming, so it doesn't compete with a window starting up
+WARM_DELAY_SECONDS = 2
+
+
+def _conf_mtimes():
+    mtimes = []
+    for path in (MPV_CONF, INPUT_CONF):
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
+def create_mpv():
+    """New mpv core with the config parsed, scripts and input confs loaded."""
+    ensure_config_files()
+
+    player = mpv.MPV(
+        # terminal=True,
+        # log_handler=print,
+        loglevel="info",
+        audio_client_name=_("Cine"),
+        screenshot_directory=SCREENSHOT_DIR,
+        screenshot_template="cine_%n",
+        config=True,
+        config_dir=CONFIG_DIR,
+        input_builtin_bindings=False,
+        input_vo_keyboard=True,
+        load_scripts=True,
+        audio_display="embedded-first",
+        audio_file_auto="fuzzy",
+        sub_auto="fuzzy",
+        sub_file_paths="sub:subs:subtitles:Sub:Subs:Subtitles:srt:srts:Srt:Srts",
+        sub_border_size=2,
+        sub_shadow_offset=0.6,
+        sub_border_color="#B6000000",
+        sub_shadow_color="#97000000",
+        sub_color="#ebebeb",
+        sub_use_margins=False,
+        sub_font="Adwaita Sans SemiBold",
+        osd_font="Adwaita Sans",
+        osd_bold=True,
+        osd_bar=False,
+        osd_blur=1,
+        osd_border_size=1.5,
+        osd_shadow_offset=0.6,
+        osd_border_color="#BE000000",
+        osd_shadow_color="#1B000000",
+        osd_margin_x=66,
+        osd_margin_y=66,
+        volume_max=150,
+        keep_open=True,
+        ytdl=True,
+        ytdl_raw_options="yes-playlist=",
+        cursor_autohide_fs_only=True,
+        directory_filter_types="video,audio",
+        autocreate_playlist="filter",
+        save_watch_history=True,
+        watch_history_path=WATCH_HISTORY_JSONL,
+    )
+
+    # mpv.conf is parsed on init, these override it
+    command_batch(
+        player,
+        [
+            ("set", "vo", "libmpv"),
+            ("set", "osc", "no"),
+            ("set", "load-console", "no"),
+            *(
+                ("change-list", "watch-later-options", "remove", option)
+                for option in (
+                    "vid",
+                    "aid",
+                    "volume",
+                    "sub-scale",
+                    "ab-loop-a",
+                    "ab-loop-b",
+                )
+            ),
+            ("load-input-conf", f"memory://{INTERNAL_BINDINGS}"),
+            ("load-input-conf", INPUT_CONF),
+            *(("load-script", path) for path in hook_script()),
+        ],
+    )
+
+    return player
+
+
+class MpvPool:
+    """
+    Keeps one spare mpv core warmed in the background for new windows.
+    Without warm, cores are only created when claimed.
+    """
+
+    def __init__(self, warm=True):
+        self._warm_spare = warm
+        self._lock = threading.Lock()
+        self._spare: mpv.MPV | None = None
+        self._spare_mtimes: list = []
+        self._warming = False
+        self._warm_id = 0
+        self._closed = False
+
+    def claim(self):
+        """Takes the spare core, or creates one if none is ready yet."""
+        with self._lock:
+            player, self._spare = self._spare, None
+
+        if player and self._spare_mtimes != _conf_mtimes():
+            # mpv.conf or input.conf changed since it was warmed
+            player.terminate()
+            player = None
+
+        if player is None:
+            player = create_mpv()
+
+        self.schedule_warm()
+        return player
+
+    def schedule_warm(self):
+        if not self._warm_spare or self._closed or self._warm_id:
+            return
+        self._warm_id = timeout_add_seconds_once(WARM_DELAY_SECONDS, self._warm)
+
+    def _warm(self):
+        self._warm_id = 0
+        with self._lock:
+            if self._closed or self._spare or self._warming:
+                return
+            self._warming = True
+
+        threading.Thread(target=self._warm_thread, daemon=True).start()
+
+    def _warm_thread(self):
+        mtimes = _conf_mtimes()
+        try:
+            player = create_mpv()
+        except Exception:
+            logger.exception("Failed to warm mpv")
+            player = None
+
+        with self._lock:
+            self._warming = False
+            if player and not self._closed:
+                self._spare, self._spare_mtimes = player, mtimes
+                player = None
+
+        if player:
+            player.terminate()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            player, self._spare = self._spare, None
+
+        if player:
+            player.terminate()
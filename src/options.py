@@ -26,7 +26,7 @@ import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk
 
-from .preferences import settings
+from .settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -34,24 +34,13 @@ gi.require_version("GObject", "2.0")
 gi.require_version("Pango", "1.0")
 from gi.repository import Adw, Gdk, Gio, GLib, GObject, Gtk, Pango
 
-from .utils import idle_add_once, is_local_path, timeout_add_once
+from .media_index import PRIORITY_NOW, format_details
+from .playlist_io import FORMATS, obj_entry, save_playlist_async
+from .utils import format_time, idle_add_once, is_local_path, timeout_add_once
 
 logger = logging.getLogger(__name__)
 
 
-class PlaylistItemObj(GObject.Object):
-    item = GObject.Property(type=object)
-    playing = GObject.Property(type=bool, default=False)
-    position = GObject.Property(type=int, default=0)
-
-    def __init__(self, item, position):
-        super().__init__()
-        self.item = item
-        self.playing = item.get("playing", False)
-        self.position = position
-        self.title = None
-
-
 @Gtk.Template(resource_path="/io/github/diegopvlk/Cine/playlist.ui")
 class Playlist(Adw.Dialog):
     __gtype_name__ = "Playlist"
@@ -82,6 +71,7 @@ class Playlist(Adw.Dialog):
             win.splice_playlist()
 
         self.set_content_height(win.get_height())
+        self._time_left_second = -1
         self.set_item_count()
 
         list_filter = Gtk.CustomFilter()
@@ -197,23 +187,35 @@ class Playlist(Adw.Dialog):
     def _on_factory_setup(self, _factory, list_item):
         row = Gtk.Box(height_request=46)
         list_item.icon = Gtk.Image(margin_start=14)
-        list_item.title = Gtk.Label(
-            halign=Gtk.Align.START,
+        labels_box = Gtk.Box(
+            orientation=Gtk.Orientation.VERTICAL,
             margin_top=5,
             margin_bottom=5,
             margin_start=12,
             margin_end=12,
             hexpand=True,
             valign=Gtk.Align.CENTER,
+        )
+        list_item.title = Gtk.Label(
+            halign=Gtk.Align.START,
             ellipsize=Pango.EllipsizeMode.END,
             xalign=0,
             css_classes=["title"],
         )
+        list_item.details = Gtk.Label(
+            halign=Gtk.Align.START,
+            ellipsize=Pango.EllipsizeMode.END,
+            xalign=0,
+            visible=False,
+            css_classes=["caption", "dim-label", "numeric"],
+        )
+        labels_box.append(list_item.title)
+        labels_box.append(list_item.details)
         list_item.playing_icon = Gtk.Image(
             margin_end=14, icon_name="cine-playback-start-symbolic", visible=False
         )
         row.append(list_item.icon)
-        row.append(list_item.title)
+        row.append(labels_box)
         row.append(list_item.playing_icon)
 
         gesture = Gtk.GestureClick.new()
@@ -295,15 +297,31 @@ class Playlist(Adw.Dialog):
             else:
                 row.remove_css_class("playing-item-playlist")
 
+        def set_details(obj, _pspec):
+            details = format_details(obj.media_info) if obj.media_info else ""
+            list_item.details.set_text(details)
+            list_item.details.set_visible(bool(details))
+
         set_item(obj.item)
         set_playing_item(obj, None)
+        set_details(obj, None)
+
+        path = obj.item.get("filename")
+        if obj.media_info is None and is_local_path(path):
+            self._win.app.media_index.request(
+                path,
+                lambda info, o=obj: self._win.update_media_info(o, info),
+                priority=PRIORITY_NOW,
+            )
 
         list_item.handler_id = obj.connect("notify::playing", set_playing_item)
+        list_item.info_handler_id = obj.connect("notify::media-info", set_details)
 
     @Gtk.Template.Callback()
     def _on_factory_unbind(self, _factory, list_item):
         obj = list_item.get_item()
         obj.disconnect(list_item.handler_id)
+        obj.disconnect(list_item.info_handler_id)
 
     def _on_drop_enter(self, target, _x, _y):
         self.drop_indicator_revealer.set_reveal_child(True)
@@ -338,37 +356,7 @@ class Playlist(Adw.Dialog):
         elif isinstance(value, str):
             items = [value]
 
-        for item in items:
-            if isinstance(item, Gio.File):
-                path = item.get_path() or item.get_uri()
-
-                is_url = not is_local_path(path)  # URL Thumbnail
-
-                if is_url:
-                    self._mpv.loadfile(path, "append-play")
-                    continue
-                else:
-                    info = item.query_info(
-                        "standard::content-type,standard::type",
-                        Gio.FileQueryInfoFlags.NONE,
-                        None,
-                    )
-
-                file_type = info.get_file_type()
-                mime_type = info.get_content_type() or ""
-
-                if file_type == Gio.FileType.DIRECTORY:
-                    self._mpv.loadfile(path, "append-play")
-                    continue
-
-                valid_types = ("video/", "audio/", "image/")
-                if mime_type.startswith(valid_types):
-                    self._mpv.loadfile(path, "append-play")
-
-            elif isinstance(item, str):  # URL string
-                self._mpv.loadfile(item, "append-play")
-
-        self.spinner.set_visible(False)
+        self._win.load_dropped(items, "append-play", self.spinner)
 
     def _on_row_drag_prepare(self, _source, _x, _y, list_item):
         index = list_item.get_item().position
@@ -465,41 +453,57 @@ class Playlist(Adw.Dialog):
         dialog.set_title(_("Save Playlist"))
         dialog.set_initial_name(_("Playlist") + ".m3u8")
 
-        m3u8_filter = Gtk.FileFilter()
-        m3u8_filter.add_suffix("m3u8")
         filters = Gio.ListStore.new(Gtk.FileFilter)
-        filters.append(m3u8_filter)
+        for fmt in FORMATS:
+            file_filter = Gtk.FileFilter(name=fmt.upper())
+            file_filter.add_suffix(fmt)
+            filters.append(file_filter)
         dialog.set_filters(filters)
 
+        def on_written(error):
+            self.spinner.set_visible(False)
+            if error:
+                self.toast_overlay.add_toast(
+                    Adw.Toast(title=_("Failed to Save Playlist"), timeout=2)
+                )
+
         def on_save(_dialog, result):
             try:
                 file = dialog.save_finish(result)
                 path = file.get_path()
-                self._write_m3u_file(self._mpv, path)
+                self._win.flush_playlist()
+                entries = [obj_entry(obj) for obj in self._win.playlist_objs]
+                self.spinner.set_visible(True)
+                save_playlist_async(path, entries, on_written)
+            except GLib.Error as e:
+                logger.warning(f"Dialog error: {e}")
             except Exception:
                 logger.exception("Save playlist failed")
 
         dialog.save(self._win, None, on_save)
 
+    def update_time_left(self, time_pos):
+        """Counts the time left down while the list isn't filtered."""
+        second = int(time_pos)
+        if second == self._time_left_second or self.search_entry.props.text:
+            return
+        self._time_left_second = second
+        self.set_item_count()
+
     def set_item_count(self, *args, list_amt=None):
         count = list_amt if list_amt is not None else self._mpv.playlist_count
         amt_label = ngettext("{n} item", "{n} items", count).format(n=count)
-        self.title_widget.set_subtitle(f"{amt_label}")
 
-    def _write_m3u_file(self, mpv, path):
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("#EXTM3U\n")
-
-            for item in mpv.playlist:
-                path = item["filename"]
-                name_with_ext = os.path.basename(path)
-                file_title = os.path.splitext(name_with_ext)[0]
-                title = file_title
-
-                if not is_local_path(path):
-                    title = item.get("title") or file_title
-
-                duration = -1
+        if list_amt is None:
+            durations = self._win.duration_index
+            if total := durations.total:
+                amt_label = f"{amt_label} · {format_time(total)}"
+                pos = self._mpv.playlist_pos
+                if pos is not None and pos >= 0:
+                    time_pos = self._mpv.time_pos or 0
+                    left = max(0, total - durations.prefix(pos) - time_pos)
+                    amt_label += " · " + _("{time} left").format(
+                        time=format_time(left)
+                    )
 
-                f.write(f"#EXTINF:{duration},{title}\n")
-                f.write(f"{path}\n")
+        self.title_widget.set_subtitle(f"{amt_label}")
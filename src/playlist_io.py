@@ -0,0 +1,284 @@
+# playlist_io.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import os
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+from xml.sax.saxutils import escape
+
+from .utils import idle_add_once, is_local_path
+
+logger = logging.getLogger(__name__)
+
+# lines buffered before each write
+CHUNK_LINES = 2000
+
+FORMATS = ("m3u8", "m3u", "pls", "xspf")
+PLAYLIST_EXTS = (".m3u", ".m3u8", ".pls")
+
+# entries handed to mpv per batch when importing
+IMPORT_BATCH = 1000
+# HLS media/master playlists are streams, mpv plays them itself
+HLS_TAG = "#EXT-X-"
+HLS_PROBE_BYTES = 4096
+
+
+def item_title(item):
+    path = item.get("filename")
+    name_with_ext = os.path.basename(path)
+    file_title = os.path.splitext(name_with_ext)[0]
+
+    if not is_local_path(path):
+        return item.get("title") or file_title
+    return file_title
+
+
+def obj_entry(obj):
+    """(title, path, duration) of a PlaylistItemObj, duration can be None."""
+    return item_title(obj.item), obj.item["filename"], obj.duration
+
+
+def loadfile_commands(entries, mode, index=None):
+    """
+    One loadfile per (title, path, duration) entry, in order. Unlike a
+    loadlist of an in-memory M3U, entries don't carry the list as their
+    playlist-path, and any path is safe. Titles are only forced on web
+    entries and when they aren't just the filename, local files keep their
+    own title tag.
+    """
+    next_mode = "append" if mode == "replace" else mode
+    for i, (title, path, _duration) in enumerate(entries):
+        if mode == "insert-at":
+            assert index is not None, "insert-at needs an index"
+            position = str(index + i)
+        else:
+            position = "-1"
+        args = ["loadfile", path, mode if i == 0 else next_mode, position]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if title and title != stem and not is_local_path(path):
+            size = len(title.encode())
+            args.append(f"force-media-title=%{size}%{title}")
+        yield args
+
+
+def m3u_lines(entries, comments=()):
+    yield "#EXTM3U\n"
+    for line in comments:
+        yield f"{line}\n"
+
+    for title, path, duration in entries:
+        if title or duration:
+            length = round(duration) if duration else -1
+            yield f"#EXTINF:{length},{title}\n"
+        yield f"{path}\n"
+
+
+def pls_lines(entries):
+    yield "[playlist]\n"
+
+    n = 0
+    for n, (title, path, duration) in enumerate(entries, 1):
+        length = round(duration) if duration else -1
+        yield f"File{n}={path}\nTitle{n}={title}\nLength{n}={length}\n"
+
+    yield f"NumberOfEntries={n}\nVersion=2\n"
+
+
+def xspf_lines(entries):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<playlist version="1" xmlns="http://xspf.org/ns/0/">\n  <trackList>\n'
+
+    for title, path, duration in entries:
+        if is_local_path(path) and os.path.isabs(path):
+            path = Path(path).as_uri()
+
+        yield "    <track>\n"
+        yield f"      <location>{escape(path)}</location>\n"
+        yield f"      <title>{escape(title)}</title>\n"
+        if duration:
+            yield f"      <duration>{round(duration * 1000)}</duration>\n"
+        yield "    </track>\n"
+
+    yield "  </trackList>\n</playlist>\n"
+
+
+def format_for_path(path):
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    return ext if ext in FORMATS else "m3u8"
+
+
+def write_playlist_file(file, entries, fmt="m3u8", comments=()):
+    """
+    Streams the (title, path, duration) entries to a temp file in chunks,
+    then renames it over file. entries can be any iterable.
+    """
+    if fmt in ("m3u", "m3u8"):
+        lines = m3u_lines(entries, comments)
+    elif fmt == "pls":
+        lines = pls_lines(entries)
+    else:
+        lines = xspf_lines(entries)
+
+    tmp_file = f"{file}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            chunk = []
+            for line in lines:
+                chunk.append(line)
+                if len(chunk) >= CHUNK_LINES:
+                    f.write("".join(chunk))
+                    chunk.clear()
+            f.write("".join(chunk))
+        os.replace(tmp_file, file)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def save_playlist_async(file, entries, callback=None):
+    """
+    Writes a playlist on a worker thread, the format comes from the extension.
+    callback(error) runs on the main thread, error is None on success.
+    """
+
+    def write():
+        error = None
+        try:
+            write_playlist_file(file, entries, format_for_path(file))
+        except Exception as e:
+            logger.exception("Failed to write playlist")
+            error = e
+
+        if callback:
+            idle_add_once(callback, error)
+
+    threading.Thread(target=write).start()
+
+
+def _is_hls(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return HLS_TAG in f.read(HLS_PROBE_BYTES)
+    except OSError:
+        return False
+
+
+def is_playlist_file(path):
+    """Local M3U/M3U8/PLS lists read by Cine, HLS playlists are left to mpv."""
+    return (
+        is_local_path(path)
+        and path.lower().endswith(PLAYLIST_EXTS)
+        and os.path.isfile(path)
+        and not _is_hls(path)
+    )
+
+
+def _parse_length(value):
+    try:
+        length = float(value)
+    except ValueError:
+        return None
+    return length if length > 0 else None
+
+
+def _parse_m3u(f):
+    title, duration = "", None
+    for line in f:
+        line = line.strip()
+        if line.startswith("#EXTINF:"):
+            length, _sep, title = line.removeprefix("#EXTINF:").partition(",")
+            duration = _parse_length(length)
+        elif line and not line.startswith("#"):
+            yield title, line, duration
+            title, duration = "", None
+
+
+def _parse_pls(f):
+    n, entry = None, {}
+    for line in f:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+
+        for field in ("File", "Title", "Length"):
+            if key.startswith(field) and key[len(field) :].isdigit():
+                idx = int(key[len(field) :])
+                if idx != n:
+                    if entry.get("File"):
+                        yield entry.get("Title", ""), entry["File"], entry.get("Length")
+                    # a Title/Length without a File is dropped, not carried over
+                    entry = {}
+                n = idx
+                entry[field] = _parse_length(value) if field == "Length" else value
+                break
+
+    if entry.get("File"):
+        yield entry.get("Title", ""), entry["File"], entry.get("Length")
+
+
+def parse_playlist(file):
+    """Yields (title, path, duration) entries of a M3U/M3U8/PLS file as read."""
+    base_dir = os.path.dirname(os.path.abspath(file))
+    parse = _parse_pls if file.lower().endswith(".pls") else _parse_m3u
+
+    with open(file, "r", encoding="utf-8", errors="replace") as f:
+        for title, path, duration in parse(f):
+            if path.startswith("file://"):
+                path = unquote(urlparse(path).path)
+            elif is_local_path(path) and not os.path.isabs(path):
+                path = os.path.normpath(os.path.join(base_dir, path))
+            yield title, path, duration
+
+
+def import_playlist(window, file, mode, callback=None):
+    """
+    Parses a playlist file on a worker thread and feeds it to mpv in batches,
+    so the first entries play and show up while the rest is still read.
+    Durations from #EXTINF/LengthN go to window.known_durations.
+    """
+
+    def add_batch(batch, batch_mode):
+        for _title, path, duration in batch:
+            if duration:
+                window.known_durations[path] = duration
+        window.run_bulk(loadfile_commands(batch, batch_mode))
+
+    def parse():
+        batch_mode = mode
+        batch = []
+        try:
+            for entry in parse_playlist(file):
+                batch.append(entry)
+                if len(batch) >= IMPORT_BATCH:
+                    idle_add_once(add_batch, batch, batch_mode)
+                    batch, batch_mode = [], "append"
+            if batch:
+                idle_add_once(add_batch, batch, batch_mode)
+        except Exception:
+            logger.exception(f"Failed to read playlist {file}")
+
+        if callback:
+            idle_add_once(callback)
+
+    threading.Thread(target=parse, daemon=True).start()
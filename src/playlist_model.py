@@ -0,0 +1,251 @@
+# playlist_model.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+
+import gi
+
+gi.require_version("GObject", "2.0")
+from gi.repository import GObject
+
+FP_MOD = (1 << 61) - 1
+FP_BASE = 1_000_003
+
+
+def path_hash(path):
+    digest = hashlib.blake2b(path.encode(errors="surrogateescape"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big") % FP_MOD
+
+
+class PlaylistFingerprint:
+    """
+    Order-sensitive hash of playlist filenames: sum of hash(path) * BASE^index.
+    A splice only touches the changed items, plus the ones after them when
+    the length changes (their index shifts).
+    """
+
+    def __init__(self, paths=()):
+        self.length = 0
+        self.value = 0
+        self.splice(0, [], [path_hash(p) for p in paths], [])
+
+    def _sum(self, hashes, index):
+        power = pow(FP_BASE, index, FP_MOD)
+        total = 0
+        for h in hashes:
+            total += h * power
+            power = power * FP_BASE % FP_MOD
+        return total
+
+    def splice(self, start, removed, added, suffix):
+        """Hashes of the removed/added items, suffix are the items after them."""
+        value = self.value - self._sum(removed, start) + self._sum(added, start)
+        if shift := len(added) - len(removed):
+            tail = self._sum(suffix, start + len(removed))
+            value += tail * (pow(FP_BASE, shift, FP_MOD) - 1)
+        self.value = value % FP_MOD
+        self.length += shift
+
+    def key(self):
+        return self.length, self.value
+
+
+class DurationIndex:
+    """
+    Item durations (unknown ones count as 0) kept in blocks of about LOAD
+    items, with Fenwick trees over the block sizes and sums. Finding an item,
+    the total and the time left from an item take O(log n + LOAD), and so does
+    inserting or removing at any position, which only moves items in one
+    block. The block trees are rebuilt, O(n / LOAD), only when blocks split
+    or merge.
+    """
+
+    LOAD = 256
+
+    def __init__(self, values=()):
+        self.rebuild(values)
+
+    def __len__(self):
+        return self._len
+
+    def rebuild(self, values):
+        values = [v or 0.0 for v in values]
+        load = self.LOAD
+        self._blocks = [values[i : i + load] for i in range(0, len(values), load)]
+        self._len = len(values)
+        self._reindex()
+
+    def _reindex(self):
+        self._sizes = [len(block) for block in self._blocks]
+        self._sums = [sum(block) for block in self._blocks]
+        self._size_tree = self._fenwick(self._sizes)
+        self._sum_tree = self._fenwick(self._sums)
+        self.total = sum(self._sums)
+
+    @staticmethod
+    def _fenwick(values):
+        tree = [0, *values]
+        n = len(values)
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        return tree
+
+    @staticmethod
+    def _tree_add(tree, b, delta):
+        i = b + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    @staticmethod
+    def _tree_prefix(tree, b):
+        total = 0
+        while b > 0:
+            total += tree[b]
+            b &= b - 1
+        return total
+
+    def _locate(self, index):
+        """Block and offset of an item, index == len gives the end of the last."""
+        tree = self._size_tree
+        b = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            # descend to the last block whose start is <= index
+            if b + step < len(tree) and tree[b + step] <= index:
+                b += step
+                index -= tree[b]
+            step >>= 1
+        if b == len(self._blocks):
+            b -= 1
+            index += self._sizes[b]
+        return b, index
+
+    def _block_changed(self, b, size_delta, sum_delta):
+        self._sizes[b] += size_delta
+        self._sums[b] += sum_delta
+        self._len += size_delta
+        self.total += sum_delta
+        if size_delta:
+            self._tree_add(self._size_tree, b, size_delta)
+        if sum_delta:
+            self._tree_add(self._sum_tree, b, sum_delta)
+
+    def prefix(self, n):
+        """Sum of the first n durations."""
+        if n <= 0 or not self._blocks:
+            return 0.0
+        if n >= self._len:
+            return self.total
+        b, offset = self._locate(n)
+        return self._tree_prefix(self._sum_tree, b) + sum(self._blocks[b][:offset])
+
+    def set(self, index, value):
+        b, offset = self._locate(index)
+        block = self._blocks[b]
+        delta = (value or 0.0) - block[offset]
+        if delta:
+            block[offset] = value or 0.0
+            self._block_changed(b, 0, delta)
+
+    def _chunks(self, values):
+        load = self.LOAD
+        return [values[i : i + load] for i in range(0, len(values), load)]
+
+    def insert(self, index, values):
+        values = [v or 0.0 for v in values]
+        if not values:
+            return
+        if not self._blocks:
+            self.rebuild(values)
+            return
+
+        b, offset = self._locate(min(index, self._len))
+        block = self._blocks[b]
+        block[offset:offset] = values
+        if len(block) <= 2 * self.LOAD:
+            self._block_changed(b, len(values), sum(values))
+            return
+
+        self._blocks[b : b + 1] = self._chunks(block)
+        self._len += len(values)
+        self._reindex()
+
+    def delete(self, index, count):
+        count = min(count, self._len - index)
+        if count <= 0:
+            return
+
+        b, offset = self._locate(index)
+        block = self._blocks[b]
+        if offset + count <= len(block):
+            removed = block[offset : offset + count]
+            del block[offset : offset + count]
+            if len(block) >= self.LOAD // 2 or len(self._blocks) == 1 and block:
+                self._block_changed(b, -count, -sum(removed))
+                return
+            # merge a small block into a neighbor, so blocks stay about LOAD
+            if len(self._blocks) > 1:
+                b = min(b, len(self._blocks) - 2)
+                self._blocks[b : b + 2] = self._chunks(
+                    self._blocks[b] + self._blocks[b + 1]
+                )
+            else:
+                self._blocks.clear()
+        else:
+            e, end_offset = self._locate(index + count)
+            rest = block[:offset] + self._blocks[e][end_offset:]
+            self._blocks[b : e + 1] = self._chunks(rest)
+
+        self._len -= count
+        self._reindex()
+
+    def splice(self, start, n_removed, added, n_after):
+        """Mirrors a model splice, added are the new durations."""
+        n_same = min(n_removed, len(added))
+        for i in range(n_same):
+            self.set(start + i, added[i])
+        if n_removed > n_same:
+            self.delete(start + n_same, n_removed - n_same)
+        elif len(added) > n_same:
+            self.insert(start + n_same, added[n_same:])
+
+
+class PlaylistItemObj(GObject.Object):
+    item = GObject.Property(type=object)
+    playing = GObject.Property(type=bool, default=False)
+    position = GObject.Property(type=int, default=0)
+    media_info = GObject.Property(type=object)
+
+    def __init__(self, item, position):
+        super().__init__()
+        self.item = item
+        self.entry_id = item.get("id")
+        self.path_hash = path_hash(item.get("filename", ""))
+        self.playing = item.get("playing", False)
+        self.position = position
+        self.title = None
+        self.duration: float | None = None
+
+    def set_media_info(self, info):
+        self.media_info = info
+        if duration := info.get("duration"):
+            self.duration = duration
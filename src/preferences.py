@@ -29,48 +29,10 @@ gi.require_version("Gio", "2.0")
 gi.require_version("Gtk", "4.0")
 from gi.repository import Adw, Gdk, Gio, Gtk
 
+from .settings import settings
 from .utils import CONFIG_DIR, display, has_host_permission, is_flatpak
 
 logger = logging.getLogger(__name__)
-settings = Gio.Settings.new("io.github.diegopvlk.Cine")
-
-
-def sync_mpv_with_settings(window):
-    """Apply settings values to the mpv instance"""
-    mpv = window.mpv
-    mpv["sub-color"] = settings.get_string("subtitle-color")
-    mpv["sub-scale"] = settings.get_double("subtitle-scale")
-    mpv["sub-font"] = settings.get_string("subtitle-font")
-    mpv["slang"] = settings.get_string("subtitle-languages")
-    mpv["alang"] = settings.get_string("audio-languages")
-    mpv["volume"] = settings.get_int("volume")
-    mpv["save-position-on-quit"] = settings.get_boolean("save-video-position")
-    hwdec_enabled = settings.get_boolean("hwdec")
-    norm_enabled = settings.get_boolean("normalize-volume")
-
-    sub_bg = settings.get_boolean("subtitle-bg")
-    mpv["sub-border-style"] = "background-box" if sub_bg else "outline-and-shadow"
-    mpv["sub-shadow-offset"] = 8 if sub_bg else 0.6
-    mpv["sub-back-color"] = (
-        settings.get_string("subtitle-bg-color") if sub_bg else "#97000000"
-    )
-    mpv["sub-border-color"] = mpv["sub-back-color"]
-
-    if hwdec_enabled:
-        mpv.command_async("vf", "remove", "@hflip")
-        mpv.command_async("vf", "remove", "@vflip")
-        mpv["hwdec"] = window.conf_hwdec + ["auto"]
-    else:
-        mpv["hwdec"] = "no"
-
-    if norm_enabled:
-        mpv.command("af", "add", "@cine_loudnorm:lavfi=[loudnorm=I=-20]")
-
-    loop = settings.get_string("loop-state")
-    if loop == "playlist":
-        mpv.loop_playlist = "inf"
-    elif loop == "file":
-        mpv.loop_file = "inf"
 
 
 @Gtk.Template(resource_path="/io/github/diegopvlk/Cine/preferences.ui")
@@ -82,6 +44,8 @@ class Preferences(Adw.Dialog):
     cmd_label: Gtk.Label = Gtk.Template.Child()
     copy_cmd_button: Gtk.Button = Gtk.Template.Child()
     open_new_row: Adw.SwitchRow = Gtk.Template.Child()
+    run_in_bg_row: Adw.SwitchRow = Gtk.Template.Child()
+    isolate_row: Adw.SwitchRow = Gtk.Template.Child()
     thumb_preview_row: Adw.SwitchRow = Gtk.Template.Child()
     offload_row: Adw.SwitchRow = Gtk.Template.Child()
     hwdec_row: Adw.SwitchRow = Gtk.Template.Child()
@@ -144,6 +108,8 @@ class Preferences(Adw.Dialog):
     def _bind_ui(self):
         bindings = [
             ("open-new-windows", self.open_new_row, "active"),
+            ("run-in-background", self.run_in_bg_row, "active"),
+            ("isolate-windows", self.isolate_row, "active"),
             ("thumbnail-preview", self.thumb_preview_row, "active"),
             ("normalize-volume", self.normalize_volume_row, "active"),
             ("graphics-offload", self.offload_row, "active"),
@@ -0,0 +1,143 @@
+# preload.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import os
+import threading
+import time
+
+import mpv
+
+from .utils import idle_add_once, is_local_path
+
+logger = logging.getLogger(__name__)
+
+MiB = 1024 * 1024
+
+# a smaller demuxer cache share leaves no room for a second demuxer
+PREFETCH_MIN_BYTES = 32 * MiB
+# bytes of the next local file read into the page cache ahead of time
+HEAD_BYTES = 4 * MiB
+# a prefetched file loads faster than this
+HIT_SECONDS = 0.15
+
+
+def _read_ahead(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, HEAD_BYTES, os.POSIX_FADV_WILLNEED)
+    except (OSError, AttributeError):
+        pass
+    finally:
+        os.close(fd)
+
+
+class PreloadManager:
+    """
+    Opens the next playlist entry ahead of time with mpv's prefetch-playlist,
+    while the window's demuxer cache share allows it, and warms the head of
+    the next local file. Counts how many transitions were preloaded in time.
+    """
+
+    def __init__(self, win):
+        self._win = win
+        self._mpv: mpv.MPV = win.mpv
+        self._prefetch = False
+        # entry ids, update() can move on before the transition is counted
+        self._expected: int | None = None
+        self._prev_expected: int | None = None
+        self._loading_expected = False
+        self._warmed: str | None = None
+        self._start = 0.0
+        self.hits = 0
+        self.misses = 0
+
+        @self._mpv.event_callback("start-file")
+        def on_start_file(event):
+            self._start = time.monotonic()
+            entry_id = event.as_dict().get("playlist_entry_id")
+            self._loading_expected = entry_id is not None and entry_id in (
+                self._expected,
+                self._prev_expected,
+            )
+
+        @self._mpv.event_callback("file-loaded")
+        def on_file_loaded(_event):
+            if self._loading_expected:
+                self._loading_expected = False
+                idle_add_once(self._on_file_loaded, time.monotonic() - self._start)
+
+    def update(self):
+        """Call when the playing entry, the playlist or the cache limits change."""
+        from .url_resolver import needs_resolving
+
+        try:
+            pos = self._mpv.playlist_pos
+        except mpv.ShutdownError:
+            return
+        objs = self._win.playlist_objs
+        next_obj = None
+        if pos is not None and 0 <= pos < len(objs) - 1:
+            next_obj = objs[pos + 1]
+
+        path = next_obj.item["filename"] if next_obj else None
+        limits = self._win.app.cache_budget.limits(self._win)
+        prefetch = bool(
+            path
+            and not needs_resolving(path)
+            and (limits is None or limits[0] >= PREFETCH_MIN_BYTES)
+        )
+        expected = next_obj.entry_id if prefetch and next_obj else None
+        if expected != self._expected:
+            self._prev_expected, self._expected = self._expected, expected
+
+        if prefetch != self._prefetch:
+            self._prefetch = prefetch
+            try:
+                self._mpv.command_async(
+                    "set", "prefetch-playlist", "yes" if prefetch else "no"
+                )
+            except mpv.ShutdownError:
+                pass
+
+        if prefetch and is_local_path(path) and path != self._warmed:
+            self._warmed = path
+            threading.Thread(target=_read_ahead, args=(path,), daemon=True).start()
+
+    def _on_file_loaded(self, load_seconds):
+        hit = load_seconds < HIT_SECONDS
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        logger.debug(
+            f"Preload {'hit' if hit else 'miss'} in {load_seconds * 1000:.0f} ms,"
+            f" {self.hits} hits, {self.misses} misses"
+        )
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,198 @@
+# queue_service.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+
+import gi
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+from gi.repository import Gio, GLib
+
+logger = logging.getLogger(__name__)
+
+QUEUE_INTERFACE = "io.github.diegopvlk.Cine.Queue"
+
+# entries returned by one GetPage call at most
+MAX_PAGE = 1000
+
+INTERFACE = """
+<node>
+    <interface name='io.github.diegopvlk.Cine.Queue'>
+        <method name='ListWindows'>
+            <arg direction='out' name='WindowIds' type='au'/>
+        </method>
+        <method name='Append'>
+            <arg direction='in' name='WindowId' type='u'/>
+            <arg direction='in' name='Uris' type='as'/>
+        </method>
+        <method name='Insert'>
+            <arg direction='in' name='WindowId' type='u'/>
+            <arg direction='in' name='Index' type='u'/>
+            <arg direction='in' name='Uris' type='as'/>
+        </method>
+        <method name='Remove'>
+            <arg direction='in' name='WindowId' type='u'/>
+            <arg direction='in' name='Start' type='u'/>
+            <arg direction='in' name='Count' type='u'/>
+        </method>
+        <method name='Move'>
+            <arg direction='in' name='WindowId' type='u'/>
+            <arg direction='in' name='Start' type='u'/>
+            <arg direction='in' name='Count' type='u'/>
+            <arg direction='in' name='Dest' type='u'/>
+        </method>
+        <method name='GetPage'>
+            <arg direction='in' name='WindowId' type='u'/>
+            <arg direction='in' name='Offset' type='u'/>
+            <arg direction='in' name='Limit' type='u'/>
+            <arg direction='out' name='Total' type='u'/>
+            <arg direction='out' name='Current' type='i'/>
+            <arg direction='out' name='Entries' type='a(ssd)'/>
+        </method>
+        <method name='GetStats'>
+            <arg direction='in' name='WindowId' type='u'/>
+            <arg direction='out' name='Stats' type='a{sv}'/>
+        </method>
+    </interface>
+</node>
+"""
+
+
+class QueueService:
+    """
+    Private D-Bus interface to read and edit a window's playlist, exported
+    on the application object path. WindowId 0 is the active window.
+    Each call is sent to mpv in one batch and synced with a single splice.
+    """
+
+    def __init__(self, app, con, path):
+        self._app = app
+        self._con = con
+
+        node_info = Gio.DBusNodeInfo.new_for_xml(INTERFACE)
+        self._reg_id = con.register_object_with_closures2(
+            object_path=path,
+            interface_info=node_info.interfaces[0],
+            method_call_closure=self._on_method_call,
+            get_property_closure=None,
+            set_property_closure=None,
+        )
+
+    def unregister(self):
+        if self._reg_id:
+            self._con.unregister_object(self._reg_id)
+            self._reg_id = 0
+
+    def _window(self, window_id):
+        if window_id:
+            return self._app.get_window_by_id(window_id)
+        return self._app.props.active_window
+
+    def _on_method_call(
+        self, _con, _sender, _path, _interface, method, params, invocation
+    ):
+        try:
+            if method == "ListWindows":
+                ids = [win.get_id() for win in self._app.get_windows()]
+                invocation.return_value(GLib.Variant("(au)", (ids,)))
+                return
+
+            args = params.unpack()
+            win = self._window(args[0])
+            if not win:
+                raise ValueError(f"No window with id {args[0]}")
+
+            if method == "Append":
+                win.enqueue(args[1], "append-play")
+                invocation.return_value(None)
+            elif method == "Insert":
+                win.insert_paths(args[2], min(args[1], len(win.playlist_objs)))
+                invocation.return_value(None)
+            elif method == "Remove":
+                win.run_bulk(self._remove_commands(win, *args[1:]))
+                invocation.return_value(None)
+            elif method == "Move":
+                win.run_bulk(self._move_commands(win, *args[1:]))
+                invocation.return_value(None)
+            elif method == "GetPage":
+                invocation.return_value(self._get_page(win, *args[1:]))
+            elif method == "GetStats":
+                invocation.return_value(self._get_stats(win))
+        except ValueError as e:
+            invocation.return_error_literal(
+                Gio.dbus_error_quark(), Gio.DBusError.INVALID_ARGS, str(e)
+            )
+        except Exception as e:
+            logger.exception(f"Queue {method} failed")
+            invocation.return_error_literal(
+                Gio.dbus_error_quark(), Gio.DBusError.FAILED, str(e)
+            )
+
+    def _check_range(self, win, start, count):
+        win.flush_playlist()
+        if start + count > len(win.playlist_objs):
+            raise ValueError("Range is out of the playlist")
+
+    def _remove_commands(self, win, start, count):
+        self._check_range(win, start, count)
+        # every removal shifts the next item to start
+        return [("playlist-remove", start)] * count
+
+    def _move_commands(self, win, start, count, dest):
+        self._check_range(win, start, count)
+        if dest > len(win.playlist_objs):
+            raise ValueError("Destination is out of the playlist")
+        if start <= dest <= start + count:
+            return []
+
+        if dest > start:
+            # the item at start goes before dest each time, keeping the order
+            return [("playlist-move", start, dest)] * count
+        return [("playlist-move", start + i, dest + i) for i in range(count)]
+
+    def _get_page(self, win, offset, limit):
+        from .playlist_io import item_title
+
+        win.flush_playlist()
+        objs = win.playlist_objs
+        page = objs[offset : offset + min(limit, MAX_PAGE)]
+        entries = [
+            (obj.item["filename"], item_title(obj.item), obj.duration or 0.0)
+            for obj in page
+        ]
+        current = win.mpv.playlist_pos
+        current = current if current is not None else -1
+        return GLib.Variant("(uia(ssd))", (len(objs), current, entries))
+
+    def _get_stats(self, win):
+        preload = win.preload.stats()
+        budget = self._app.cache_budget
+        per_window, total = budget.usage()
+        limit = (budget.limits(win) or (0, 0))[0]
+        stats = {
+            "cache-bytes": GLib.Variant("t", per_window.get(win, 0)),
+            "cache-limit-bytes": GLib.Variant("t", limit),
+            "cache-total-bytes": GLib.Variant("t", total),
+            "cache-budget-bytes": GLib.Variant("t", budget.budget),
+            "preload-hits": GLib.Variant("u", preload["hits"]),
+            "preload-misses": GLib.Variant("u", preload["misses"]),
+            "preload-hit-rate": GLib.Variant("d", preload["hit_rate"]),
+        }
+        return GLib.Variant("(a{sv})", (stats,))
@@ -0,0 +1,79 @@
+# resolver_hook.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import functools
+import logging
+import os
+
+from .utils import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+HOOK_SCRIPT = os.path.join(CACHE_DIR, "cine-resolver.lua")
+
+# Runs before ytdl_hook (priority 10), so entries resolved by Cine play
+# directly. Anything else falls through to ytdl_hook as usual.
+HOOK_LUA = """\
+local utils = require "mp.utils"
+
+mp.add_hook("on_load", 9, function()
+    local data = mp.get_property("user-data/cine/resolved", "")
+    if data == "" then
+        return
+    end
+
+    local url = mp.get_property("stream-open-filename", "")
+    local resolved = utils.parse_json(data) or {}
+    local entry = resolved[(url:gsub("^ytdl://", ""))]
+    if not entry or entry.expires <= os.time() then
+        return
+    end
+
+    mp.set_property("stream-open-filename", entry.url)
+    if entry.headers and #entry.headers > 0 then
+        mp.set_property_native("file-local-options/http-header-fields", entry.headers)
+    end
+    if entry.audio then
+        mp.set_property_native("file-local-options/audio-files", {entry.audio})
+    end
+    if entry.title then
+        mp.set_property("file-local-options/force-media-title", entry.title)
+    end
+end)
+"""
+
+
+@functools.cache
+def hook_script():
+    """The on_load hook script path, written on first use, empty if it can't be."""
+    try:
+        with open(HOOK_SCRIPT) as f:
+            if f.read() == HOOK_LUA:
+                return (HOOK_SCRIPT,)
+    except OSError:
+        pass
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(HOOK_SCRIPT, "w") as f:
+            f.write(HOOK_LUA)
+    except OSError:
+        logger.exception("Failed to write the resolver hook")
+        return ()
+    return (HOOK_SCRIPT,)
@@ -19,41 +19,129 @@
 
 import logging
 import os
+import threading
 from gettext import gettext as _
 
-from .preferences import settings
-from .utils import LAST_PLAYLIST_FILE, idle_add_once, is_local_path
+import mpv
+
+from .playlist_model import PlaylistFingerprint
+from .settings import settings
+from .utils import LAST_PLAYLIST_FILE, idle_add_once
 
 logger = logging.getLogger(__name__)
 
 
-def save_last_playlist_file(win_mpv):
-    """Saves the current playlist to a m3u8 file."""
+POS_MARKER = "#CINE-PLAYLIST-POS:"
+
+_save_lock = threading.Lock()
+
+# (length, hash) of the saved playlist, read from disk only once
+_saved_fp: tuple[int, int] | None = None
+
+
+def write_playlist(items, pos, file=LAST_PLAYLIST_FILE, comments=()):
+    """
+    Writes (title, path, duration) items to a temp file renamed over file.
+    No items and no comments leave an empty file.
+    """
+    from .playlist_io import write_playlist_file
 
     try:
-        win_mpv.write_watch_later_config()
-        with open(LAST_PLAYLIST_FILE, "w", encoding="utf-8") as f:
-            if win_mpv.idle_active:
-                f.write("")
-                return
+        with _save_lock:
+            if items or comments:
+                comments = [f"{POS_MARKER}{pos}", *comments]
+                write_playlist_file(file, items, "m3u8", comments)
+            else:
+                open(file, "w").close()
+    except Exception:
+        logger.exception("Failed to save last playlist file")
 
-            f.write("#EXTM3U\n")
-            for item in win_mpv.playlist:
-                path = item.get("filename")
-                name_with_ext = os.path.basename(path)
-                file_title = os.path.splitext(name_with_ext)[0]
-                title = file_title
 
-                if not is_local_path(path):
-                    title = item.get("title") or file_title
+def save_last_playlist_file(window):
+    """Saves the current playlist to a m3u8 file, written off the main thread."""
+    global _saved_fp
+    from .playlist_io import obj_entry
 
-                f.write(f"#EXTINF:{-1},{title}\n")
-                f.write(f"{path}\n")
+    win_mpv = window.mpv
 
+    try:
+        win_mpv.command_async("write-watch-later-config")
+
+        items = []
+        pos = 0
+        if not win_mpv.idle_active:
+            window.flush_playlist()
+            pos = win_mpv.playlist_pos or 0
+            items = [obj_entry(obj) for obj in window.playlist_objs]
+
+        _saved_fp = PlaylistFingerprint(entry[1] for entry in items).key()
+        threading.Thread(target=write_playlist, args=(items, pos)).start()
     except Exception:
         logger.exception("Failed to save last playlist file")
 
 
+def read_playlist(file):
+    """Returns the (title, path, duration) items and the saved position."""
+    items = []
+    pos = None
+    title = ""
+    duration = None
+
+    with open(file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith(POS_MARKER):
+                pos = int(line.removeprefix(POS_MARKER))
+            elif line.startswith("#EXTINF:"):
+                length, _sep, title = line.removeprefix("#EXTINF:").partition(",")
+                try:
+                    duration = float(length) if float(length) > 0 else None
+                except ValueError:
+                    duration = None
+            elif line and not line.startswith("#"):
+                items.append((title, line, duration))
+                title, duration = "", None
+
+    return items, pos
+
+
+def _restore_commands(items, pos, start_time=None):
+    """
+    The saved current item first, so it plays right away,
+    then the items before it and after it.
+    """
+    from .playlist_io import loadfile_commands
+
+    if start_time is None:
+        yield from loadfile_commands(items[pos : pos + 1], "replace")
+    else:
+        yield ["loadfile", items[pos][1], "replace", "-1", f"start={start_time}"]
+    yield from loadfile_commands(items[:pos], "insert-at", 0)
+    yield from loadfile_commands(items[pos + 1 :], "append")
+
+
+def _on_playlist_read(window, result, from_checkpoint=False):
+    global _saved_fp
+    if window.restore_cancelled:
+        # files opened meanwhile win over the session
+        return
+
+    items, pos, start_time = result
+    if items and not from_checkpoint:
+        _saved_fp = PlaylistFingerprint(entry[1] for entry in items).key()
+
+    try:
+        if pos is None or not items:
+            # saved before streaming, mpv resumes from the playlist file itself
+            window.mpv.loadfile(LAST_PLAYLIST_FILE, "replace")
+            return
+
+        pos = max(0, min(pos, len(items) - 1))
+        window.restore_run = window.run_bulk(_restore_commands(items, pos, start_time))
+    except mpv.ShutdownError:
+        pass
+
+
 def restore_last_playlist(window, app, win_mpv):
     """Restore the last playlist if its the first window."""
 
@@ -61,34 +149,53 @@ def restore_last_playlist(window, app, win_mpv):
         if len(app.get_windows()) > 1:
             return
 
+        from .checkpoint import find_checkpoint, read_checkpoint
+
         FILE = LAST_PLAYLIST_FILE
+        checkpoint = find_checkpoint()
+        from_checkpoint = checkpoint is not None
 
-        if not os.path.exists(FILE) or os.path.getsize(FILE) == 0:
+        if not from_checkpoint and (
+            not os.path.exists(FILE) or os.path.getsize(FILE) == 0
+        ):
             return
 
         window.start_page.set_sensitive(False)
         window.show_toast(_("Restoring Session…"), force_dismiss=True)
-        idle_add_once(win_mpv.loadfile, LAST_PLAYLIST_FILE, "replace")
+
+        def read_session():
+            try:
+                if from_checkpoint:
+                    result = read_checkpoint(checkpoint)
+                else:
+                    result = (*read_playlist(FILE), None)
+            except Exception:
+                logger.exception("Failed to read last playlist file")
+                result = ([], None, None)
+            idle_add_once(_on_playlist_read, window, result, from_checkpoint)
+
+        threading.Thread(target=read_session, daemon=True).start()
     except Exception:
         logger.exception("Failed to restore last playlist file")
 
 
-def is_same_playlist(mpv_playlist):
+def _saved_fingerprint():
+    global _saved_fp
+    if _saved_fp is None:
+        items, _pos = read_playlist(LAST_PLAYLIST_FILE)
+        _saved_fp = PlaylistFingerprint(entry[1] for entry in items).key()
+    return _saved_fp
+
+
+def is_same_playlist(window):
     """Compares current playlist with the saved file from last session."""
 
     if not settings.get_boolean("save-session"):
         return
 
     try:
-        with open(LAST_PLAYLIST_FILE, "r", encoding="utf-8") as f:
-            saved_filenames = [
-                line.strip() for line in f if line.strip() and not line.startswith("#")
-            ]
-
-        curr_filenames = [item.get("filename") for item in mpv_playlist]
-
-        return saved_filenames == curr_filenames
-
+        window.flush_playlist()
+        return window.playlist_fp.key() == _saved_fingerprint()
     except Exception:
         logger.exception("Failed to read last playlist file")
         return False
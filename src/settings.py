@@ -0,0 +1,76 @@
+# settings.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import gi
+
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio
+
+from .utils import command_batch
+
+settings = Gio.Settings.new("io.github.diegopvlk.Cine")
+
+
+def sync_mpv_with_settings(window):
+    """Apply settings values to the mpv instance"""
+    mpv = window.mpv
+
+    def yes_no(key):
+        return "yes" if settings.get_boolean(key) else "no"
+
+    sub_bg = settings.get_boolean("subtitle-bg")
+    sub_back_color = (
+        settings.get_string("subtitle-bg-color") if sub_bg else "#97000000"
+    )
+
+    commands = [
+        ("set", "sub-color", settings.get_string("subtitle-color")),
+        ("set", "sub-scale", str(settings.get_double("subtitle-scale"))),
+        ("set", "sub-font", settings.get_string("subtitle-font")),
+        ("set", "slang", settings.get_string("subtitle-languages")),
+        ("set", "alang", settings.get_string("audio-languages")),
+        ("set", "volume", str(settings.get_int("volume"))),
+        ("set", "save-position-on-quit", yes_no("save-video-position")),
+        (
+            "set",
+            "sub-border-style",
+            "background-box" if sub_bg else "outline-and-shadow",
+        ),
+        ("set", "sub-shadow-offset", "8" if sub_bg else "0.6"),
+        ("set", "sub-back-color", sub_back_color),
+        ("set", "sub-border-color", sub_back_color),
+    ]
+
+    if settings.get_boolean("hwdec"):
+        mpv.command_async("vf", "remove", "@hflip")
+        mpv.command_async("vf", "remove", "@vflip")
+        commands.append(("set", "hwdec", ",".join(window.conf_hwdec + ["auto"])))
+    else:
+        commands.append(("set", "hwdec", "no"))
+
+    if settings.get_boolean("normalize-volume"):
+        commands.append(("af", "add", "@cine_loudnorm:lavfi=[loudnorm=I=-20]"))
+
+    loop = settings.get_string("loop-state")
+    if loop == "playlist":
+        commands.append(("set", "loop-playlist", "inf"))
+    elif loop == "file":
+        commands.append(("set", "loop-file", "inf"))
+
+    command_batch(mpv, commands)
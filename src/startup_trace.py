@@ -0,0 +1,89 @@
+# startup_trace.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Per-phase startup timings, printed with --startup-trace.
+# Marks are always recorded (they are cheap), since the option is only parsed
+# after most of the startup already happened. No gi imports here, so this
+# module can be loaded first.
+
+import os
+import sys
+import time
+
+enabled = False
+
+_marks: list[tuple[str, float]] = []
+
+
+def _process_start():
+    """Process start time on the monotonic clock, read from /proc."""
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        # starttime is field 22, the command name may contain spaces
+        ticks = int(stat.rsplit(")", 1)[1].split()[19])
+        started = ticks / os.sysconf("SC_CLK_TCK")
+        since_start = time.clock_gettime(time.CLOCK_BOOTTIME) - started
+        return time.monotonic() - since_start
+    except Exception:
+        return None
+
+
+_start = _process_start()
+
+
+def mark(phase):
+    _marks.append((phase, time.monotonic()))
+
+
+def report():
+    global enabled
+    if not enabled or not _marks:
+        return
+    enabled = False
+
+    prev = start = _start if _start is not None else _marks[0][1]
+    lines = [f"{'phase':<28}{'delta ms':>10}{'total ms':>10}"]
+    if _start is not None:
+        lines.append(f"{'process start':<28}{0:>10.1f}{0:>10.1f}")
+
+    for phase, t in _marks:
+        lines.append(f"{phase:<28}{(t - prev) * 1000:>10.1f}{(t - start) * 1000:>10.1f}")
+        prev = t
+
+    print("\n".join(lines), file=sys.stderr, flush=True)
+
+
+def trace_first_frame(widget):
+    """Report once the frame clock of widget finished its first paint."""
+    if not enabled:
+        return
+
+    def on_after_paint(clock):
+        clock.disconnect(handler_id)
+        mark("first frame")
+        report()
+
+    def on_tick(widget, clock):
+        nonlocal handler_id
+        handler_id = clock.connect("after-paint", on_after_paint)
+        return False
+
+    handler_id = 0
+    widget.add_tick_callback(on_tick)
@@ -0,0 +1,192 @@
+# url_resolver.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import logging
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from .utils import idle_add_once
+
+logger = logging.getLogger(__name__)
+
+WORKERS = 2
+# next playlist entries resolved ahead
+URL_PREFETCH = 2
+RESOLVE_TIMEOUT = 60
+MAX_ENTRIES = 500
+# stream URLs without an expire= parameter are kept this long
+DEFAULT_TTL = 30 * 60
+# not handed to mpv when it expires sooner than this
+EXPIRY_MARGIN = 60
+
+URL_SCHEMES = ("http://", "https://", "ytdl://")
+# direct media links don't need resolving
+DIRECT_EXTS = (
+    ".mp4",
+    ".mkv",
+    ".webm",
+    ".mov",
+    ".m4a",
+    ".mp3",
+    ".ogg",
+    ".opus",
+    ".flac",
+    ".m3u8",
+    ".mpd",
+)
+
+def needs_resolving(url):
+    if not url.startswith(URL_SCHEMES):
+        return False
+    return not urlparse(url).path.lower().endswith(DIRECT_EXTS)
+
+
+def resolver_cmd(url, ytdl_format):
+    """
+    yt-dlp by default, CINE_URL_RESOLVER replaces it with any command
+    that prints yt-dlp -J style JSON for the URL given as last argument.
+    """
+    if custom := os.environ.get("CINE_URL_RESOLVER"):
+        return [*shlex.split(custom), url]
+
+    cmd = ["yt-dlp", "-J", "--flat-playlist", "--no-warnings"]
+    if ytdl_format:
+        cmd += ["-f", ytdl_format]
+    return [*cmd, "--", url]
+
+
+def _expires(url, now):
+    ttl = DEFAULT_TTL
+    if expire := parse_qs(urlparse(url).query).get("expire"):
+        try:
+            ttl = min(ttl, int(expire[0]) - now)
+        except ValueError:
+            pass
+    return int(now + ttl)
+
+
+def parse_info(info):
+    """Stream URL, separate audio, headers and title from yt-dlp JSON."""
+    if info.get("_type", "video") != "video":
+        # playlists are left for ytdl_hook to expand
+        return None
+
+    formats = info.get("requested_formats") or [info]
+    video = next((f for f in formats if f.get("vcodec") != "none"), formats[0])
+    audio = next(
+        (f for f in formats if f is not video and f.get("acodec") != "none"), None
+    )
+    if not video.get("url"):
+        return None
+
+    headers = video.get("http_headers") or info.get("http_headers") or {}
+    now = time.time()
+    expires = _expires(video["url"], now)
+    if audio:
+        expires = min(expires, _expires(audio["url"], now))
+
+    return {
+        "url": video["url"],
+        "audio": audio["url"] if audio else None,
+        "headers": [f"{key}: {value}" for key, value in headers.items()],
+        "title": info.get("title"),
+        "expires": expires,
+    }
+
+
+class UrlResolver:
+    """
+    Resolves web URLs to stream URLs ahead of time with a small pool of
+    yt-dlp processes. Results are cached until they expire.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        # url -> entry, None when it can't be resolved
+        self._cache: dict[str, dict | None] = {}
+        self._callbacks: dict[str, list] = {}
+        self._threads: list[threading.Thread] = []
+        self._disabled = False
+
+    def get(self, url):
+        entry = self._cache.get(url)
+        if entry and entry["expires"] - EXPIRY_MARGIN > time.time():
+            return entry
+        return None
+
+    def resolve(self, url, ytdl_format, callback):
+        """Calls back on the main thread with the entry, if it resolves."""
+        if self._disabled:
+            return
+        if entry := self.get(url):
+            callback(entry)
+            return
+        if url in self._cache and self._cache[url] is None:
+            return
+        if url in self._callbacks:
+            self._callbacks[url].append(callback)
+            return
+
+        self._callbacks[url] = [callback]
+        self._queue.put((url, ytdl_format))
+        if len(self._threads) < WORKERS:
+            thread = threading.Thread(target=self._work, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self):
+        while True:
+            url, ytdl_format = self._queue.get()
+            entry = None
+            try:
+                output = subprocess.check_output(
+                    resolver_cmd(url, ytdl_format),
+                    text=True,
+                    timeout=RESOLVE_TIMEOUT,
+                    stderr=subprocess.DEVNULL,
+                )
+                entry = parse_info(json.loads(output or "{}"))
+            except FileNotFoundError:
+                logger.warning("No URL resolver found, resolving ahead is off")
+                self._disabled = True
+            except (subprocess.SubprocessError, ValueError) as e:
+                logger.info(f"Could not resolve {url}: {e}")
+            except Exception:
+                logger.exception(f"Resolving {url} failed")
+            idle_add_once(self._on_resolved, url, entry)
+
+    def _on_resolved(self, url, entry):
+        self._cache[url] = entry
+        if len(self._cache) > MAX_ENTRIES:
+            now = time.time()
+            for key, value in list(self._cache.items()):
+                if value is None or value["expires"] < now:
+                    del self._cache[key]
+            while len(self._cache) > MAX_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+
+        for callback in self._callbacks.pop(url, []):
+            if entry:
+                callback(entry)
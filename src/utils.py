@@ -17,7 +17,9 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import concurrent.futures
 import ctypes
+import functools
 import logging
 import os
 from urllib.parse import urlparse
@@ -38,46 +40,57 @@ from gi.repository import (
 logging.basicConfig(format="%(levelname)s: [%(filename)s:%(lineno)d] %(message)s")
 logger = logging.getLogger(__name__)
 
-gtk = ctypes.CDLL("libgtk-4.so.1")
 display = Gdk.Display.get_default()
 
-try:
-    join = os.path.join
+join = os.path.join
 
-    XDG_PICTURES = GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_PICTURES)
-    SCREENSHOT_DIR = join(XDG_PICTURES, "Cine Screenshots") if XDG_PICTURES else ""
+XDG_PICTURES = GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_PICTURES)
+SCREENSHOT_DIR = join(XDG_PICTURES, "Cine Screenshots") if XDG_PICTURES else ""
 
-    BASE_CONFIG = GLib.get_user_config_dir()
+BASE_CONFIG = GLib.get_user_config_dir()
 
-    CONFIG_DIR = join(BASE_CONFIG, "cine")
-    INPUT_CONF = join(CONFIG_DIR, "input.conf")
-    MPV_CONF = join(CONFIG_DIR, "mpv.conf")
-    WATCH_HISTORY_JSONL = join(CONFIG_DIR, "watch_history.jsonl")
+CONFIG_DIR = join(BASE_CONFIG, "cine")
+INPUT_CONF = join(CONFIG_DIR, "input.conf")
+MPV_CONF = join(CONFIG_DIR, "mpv.conf")
+WATCH_HISTORY_JSONL = join(CONFIG_DIR, "watch_history.jsonl")
 
-    OLD_PL_FILE = join(CONFIG_DIR, "last-playlist.m3u8")
-    PLAYLIST_DIR = join(CONFIG_DIR, "last-playlist")
-    LAST_PLAYLIST_FILE = join(PLAYLIST_DIR, "last-playlist.m3u8")
+OLD_PL_FILE = join(CONFIG_DIR, "last-playlist.m3u8")
+PLAYLIST_DIR = join(CONFIG_DIR, "last-playlist")
+LAST_PLAYLIST_FILE = join(PLAYLIST_DIR, "last-playlist.m3u8")
 
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    os.makedirs(PLAYLIST_DIR, exist_ok=True)
+CACHE_DIR = join(GLib.get_user_cache_dir(), "cine")
 
-    for file in [
-        INPUT_CONF,
-        MPV_CONF,
-        WATCH_HISTORY_JSONL,
-    ]:
-        if not os.path.exists(file):
-            open(file, "w").close()
+_config_ready = False
 
-    if os.path.exists(OLD_PL_FILE):
-        from shutil import move
 
-        move(OLD_PL_FILE, PLAYLIST_DIR)
-    elif not os.path.exists(LAST_PLAYLIST_FILE):
-        open(LAST_PLAYLIST_FILE, "w").close()
+def ensure_config_files():
+    """Create the config files/folders, done once before the first mpv starts."""
+    global _config_ready
+    if _config_ready:
+        return
+    _config_ready = True
 
-except Exception:
-    logger.exception("Failed to create files/folders")
+    try:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        os.makedirs(PLAYLIST_DIR, exist_ok=True)
+
+        for file in [
+            INPUT_CONF,
+            MPV_CONF,
+            WATCH_HISTORY_JSONL,
+        ]:
+            if not os.path.exists(file):
+                open(file, "w").close()
+
+        if os.path.exists(OLD_PL_FILE):
+            from shutil import move
+
+            move(OLD_PL_FILE, PLAYLIST_DIR)
+        elif not os.path.exists(LAST_PLAYLIST_FILE):
+            open(LAST_PLAYLIST_FILE, "w").close()
+
+    except Exception:
+        logger.exception("Failed to create files/folders")
 
 
 is_flatpak = os.environ.get("container") == "flatpak"
@@ -143,8 +156,17 @@ def is_local_path(path):
     return bool(not parsed.scheme or parsed.scheme == "file" or len(parsed.scheme) == 1)
 
 
+# callback being run by the *_once wrappers, the stall watchdog reports it
+current_callback = None
+
+
 def _run_once(func, *args, **kwargs):
-    func(*args, **kwargs)
+    global current_callback
+    current_callback = func
+    try:
+        func(*args, **kwargs)
+    finally:
+        current_callback = None
     return GLib.SOURCE_REMOVE
 
 
@@ -160,6 +182,37 @@ def timeout_add_seconds_once(interval: int, func, *args, **kwargs) -> int:
     return GLib.timeout_add_seconds(interval, _run_once, func, *args, **kwargs)
 
 
+def command_batch(player, commands, timeout=5):
+    """
+    Queues all commands at once instead of one core round trip each.
+    mpv runs async commands in order, so only the last one is waited for.
+    """
+
+    def on_done(args, future):
+        if error := future.exception():
+            logger.error(f"mpv command {args} failed: {error}")
+
+    future = None
+    last_args = None
+    for args in commands:
+        future = player.command_async(*args)
+        future.add_done_callback(lambda f, args=args: on_done(args, f))
+        last_args = args
+
+    if future:
+        try:
+            future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning(f"mpv command {last_args} not done after {timeout}s")
+        except Exception:
+            pass  # logged by on_done
+
+
+@functools.cache
+def _libgtk():
+    return ctypes.CDLL("libgtk-4.so.1")
+
+
 def get_display_param():
     param = {}
 
@@ -171,6 +224,7 @@ def get_display_param():
         return ctypes.pythonapi.PyCapsule_GetPointer(display.__gpointer__, None)
 
     try:
+        gtk = _libgtk()
         if isinstance(display, GdkWayland.WaylandDisplay):
             gtk.gdk_wayland_display_get_wl_display.restype = ctypes.c_void_p
             gtk.gdk_wayland_display_get_wl_display.argtypes = [ctypes.c_void_p]
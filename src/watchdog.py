@@ -0,0 +1,123 @@
+# watchdog.py
+#
+# Copyright 2026 Diego Povliuk
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import traceback
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from . import utils
+
+logger = logging.getLogger(__name__)
+
+STALL_LOG = os.path.join(GLib.get_user_state_dir(), "cine", "stalls.log")
+STALL_LOG_BYTES = 1024 * 1024
+STALL_LOG_BACKUPS = 3
+
+
+def _callback_name(func):
+    if func is None:
+        return "unknown (not an *_once callback)"
+    name = getattr(func, "__qualname__", None) or repr(func)
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+class Watchdog:
+    """
+    Heartbeats the main loop from a timeout and checks it from a thread.
+    When the loop is blocked past the threshold, the main thread stack and
+    the running callback are captured, and written to a rotating log once
+    the stall ends.
+    """
+
+    def __init__(self, threshold_ms=50):
+        self.threshold = threshold_ms / 1000
+        self._beat = time.monotonic()
+        main_id = threading.main_thread().ident
+        assert main_id is not None  # the main thread is always started
+        self._main_id = main_id
+        self._stop = threading.Event()
+        self._source_id = 0
+        self._log = logging.getLogger("cine.stalls")
+        self._log.propagate = False
+
+    def start(self):
+        try:
+            os.makedirs(os.path.dirname(STALL_LOG), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                STALL_LOG, maxBytes=STALL_LOG_BYTES, backupCount=STALL_LOG_BACKUPS
+            )
+        except OSError:
+            logger.exception("Failed to open the stall log")
+            return
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self._log.addHandler(handler)
+        self._log.setLevel(logging.INFO)
+
+        interval = max(1, int(self.threshold * 1000 / 2))
+        self._source_id = GLib.timeout_add(
+            interval, self._heartbeat, priority=GLib.PRIORITY_HIGH
+        )
+        threading.Thread(target=self._watch, daemon=True).start()
+        logger.info(f"Stall watchdog on, threshold {self.threshold * 1000:.0f} ms")
+
+    def stop(self):
+        self._stop.set()
+        if self._source_id:
+            GLib.source_remove(self._source_id)
+            self._source_id = 0
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+        return GLib.SOURCE_CONTINUE
+
+    def _watch(self):
+        stall = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat
+
+            if stall and beat != stall["beat"]:
+                # the loop ran again, the stall is over
+                self._report(stall, beat - stall["beat"])
+                stall = None
+
+            if not stall and blocked > self.threshold:
+                frame = sys._current_frames().get(self._main_id)
+                stall = {
+                    "beat": beat,
+                    "callback": _callback_name(utils.current_callback),
+                    "stack": "".join(traceback.format_stack(frame)) if frame else "",
+                }
+
+    def _report(self, stall, duration):
+        ms = duration * 1000
+        logger.warning(f"Main loop blocked for {ms:.0f} ms in {stall['callback']}")
+        self._log.info(
+            f"blocked {ms:.0f} ms in {stall['callback']}\n{stall['stack']}"
+        )
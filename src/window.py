@@ -18,11 +18,13 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import bisect
+import json
 import logging
 import os
 import shlex
+from collections import deque
 from gettext import gettext as _
-from typing import cast
+from typing import TYPE_CHECKING, cast
 from urllib.parse import urlparse
 
 import gi
@@ -36,26 +38,22 @@ gi.require_version("Gtk", "4.0")
 gi.require_version("GObject", "2.0")
 from gi.repository import Adw, Gdk, Gio, GLib, GObject, Gtk
 
-from .history import HistoryDialog
+from . import startup_trace
+from .cache_policy import CachePolicy
 from .mpris import MPRIS
 from .mpv_gl_area import ThumbPreviewGLArea, VideoGLArea
 from .options import OptionsMenuButton
-from .playlist import Playlist, PlaylistItemObj
-from .preferences import settings, sync_mpv_with_settings
+from .playlist_model import DurationIndex, PlaylistFingerprint, PlaylistItemObj
 from .save_session import (
     is_same_playlist,
     restore_last_playlist,
     save_last_playlist_file,
 )
-from .shortcuts import INTERNAL_BINDINGS, populate_shortcuts_dialog_mpv
+from .settings import settings, sync_mpv_with_settings
 from .utils import (
-    CONFIG_DIR,
-    INPUT_CONF,
     KEY_REMAP,
     MBTN_MAP,
-    SCREENSHOT_DIR,
     SUB_EXTS,
-    WATCH_HISTORY_JSONL,
     PrimaryClick,
     SecondaryClick,
     append_modifiers,
@@ -70,12 +68,24 @@ from .utils import (
     timeout_add_seconds_once,
 )
 
+if TYPE_CHECKING:
+    from .checkpoint import SessionCheckpointer
+    from .drop_loader import DropLoader
+    from .playlist import Playlist
+
 logger = logging.getLogger(__name__)
 
 gtk_setts: Gtk.Settings | None = Gtk.Settings.get_default()
 
 DEFAULT_WIDTH, DEFAULT_HEIGHT = 1120, 630
 
+# commands sent to mpv per main loop iteration by run_bulk
+BULK_CHUNK = 500
+# while bulk commands run, the playlist is synced at most this often
+BULK_SPLICE_MS = 500
+# a seek accepted without a playback restart after this is given up on
+SEEK_RESTART_TIMEOUT_MS = 1000
+
 
 @Gtk.Template(resource_path="/io/github/diegopvlk/Cine/window.ui")
 class CineWindow(Adw.ApplicationWindow):
@@ -138,9 +148,28 @@ class CineWindow(Adw.ApplicationWindow):
         Gtk.WindowGroup().add_window(self)
 
         self._visible_dialog: Adw.Dialog | None = None
+        self.playlist_dialog: "Playlist | None" = None
         self.playlist_ls: Gio.ListStore = Gio.ListStore.new(PlaylistItemObj)
+        self.playlist_objs: list[PlaylistItemObj] = []
+        self.playlist_by_id: dict[int, PlaylistItemObj] = {}
+        self._playing_obj: PlaylistItemObj | None = None
+        self.playlist_fp = PlaylistFingerprint()
+        self.duration_index = DurationIndex()
+        self._checkpoint: "SessionCheckpointer | None" = None
+        self.known_durations: dict[str, float] = {}
+        self._importing: bool = False
+        self._load_queue: list[tuple[list[str], str]] = []
+        self._bulk_queue: deque = deque()
+        self._bulk_pending: int = 0
+        self._bulk_pump_id: int = 0
+        self._bulk_last_future = None
+        self.restore_run = None
+        self.restore_cancelled = False
+        self._drop_loader: "DropLoader | None" = None
+        self._resolved_urls: dict[str, dict] = {}
+        self._info_refresh_id: int = 0
+        self._doc_path_count: int = 0
         self._playlist_debounce_id: int = 0
-        self._playlist_prev_pos: int
         self.prev_shuffle: bool = False
         self.playlist_changed: bool = False
         self.has_some_doc_path: bool = False
@@ -174,6 +203,10 @@ class CineWindow(Adw.ApplicationWindow):
         self._hide_icon_indicator: bool = True
         self._skip_obs_count: int = 0
         self._playing_on_press: bool = False
+        self._prog_dragging: bool = False
+        self._seek_target: tuple[float, str] | None = None
+        self._seek_in_flight: bool = False
+        self._seek_gen: int = 0
         self.thumb_area: ThumbPreviewGLArea | None = None
         self._thumb_w: int = 1280
         self._is_local_path: bool = True
@@ -185,49 +218,8 @@ class CineWindow(Adw.ApplicationWindow):
         self._is_inactive: bool = False
         self._mpv_ctx: mpv.MpvRenderContext
 
-        self.mpv = mpv.MPV(
-            # terminal=True,
-            # log_handler=print,
-            loglevel="info",
-            audio_client_name=_("Cine"),
-            screenshot_directory=SCREENSHOT_DIR,
-            screenshot_template="cine_%n",
-            config=True,
-            config_dir=CONFIG_DIR,
-            input_builtin_bindings=False,
-            input_vo_keyboard=True,
-            load_scripts=True,
-            audio_display="embedded-first",
-            audio_file_auto="fuzzy",
-            sub_auto="fuzzy",
-            sub_file_paths="sub:subs:subtitles:Sub:Subs:Subtitles:srt:srts:Srt:Srts",
-            sub_border_size=2,
-            sub_shadow_offset=0.6,
-            sub_border_color="#B6000000",
-            sub_shadow_color="#97000000",
-            sub_color="#ebebeb",
-            sub_use_margins=False,
-            sub_font="Adwaita Sans SemiBold",
-            osd_font="Adwaita Sans",
-            osd_bold=True,
-            osd_bar=False,
-            osd_blur=1,
-            osd_border_size=1.5,
-            osd_shadow_offset=0.6,
-            osd_border_color="#BE000000",
-            osd_shadow_color="#1B000000",
-            osd_margin_x=66,
-            osd_margin_y=66,
-            volume_max=150,
-            keep_open=True,
-            ytdl=True,
-            ytdl_raw_options="yes-playlist=",
-            cursor_autohide_fs_only=True,
-            directory_filter_types="video,audio",
-            autocreate_playlist="filter",
-            save_watch_history=True,
-            watch_history_path=WATCH_HISTORY_JSONL,
-        )
+        self.mpv: mpv.MPV = self.app.mpv_pool.claim()  # type: ignore
+        startup_trace.mark("mpv created")
 
         self.video_area = VideoGLArea(self.mpv)
         self.offload: Gtk.GraphicsOffload = Gtk.GraphicsOffload(child=self.video_area)
@@ -244,26 +236,11 @@ class CineWindow(Adw.ApplicationWindow):
             self.maximize()
 
         self.conf_hwdec = list(filter(lambda x: x != "no", cast(list, self.mpv.hwdec)))
-        self.mpv["vo"] = "libmpv"
-        self.mpv["osc"] = "no"
-        self.mpv["load-console"] = "no"
-        self.mpv.command("change-list", "watch-later-options", "remove", "vid")
-        self.mpv.command("change-list", "watch-later-options", "remove", "aid")
-        self.mpv.command("change-list", "watch-later-options", "remove", "volume")
-        self.mpv.command("change-list", "watch-later-options", "remove", "sub-scale")
-        self.mpv.command("change-list", "watch-later-options", "remove", "ab-loop-a")
-        self.mpv.command("change-list", "watch-later-options", "remove", "ab-loop-b")
 
         self._setup_actions()
         self._setup_widgets()
         self._setup_observers()
 
-        try:
-            self.mpv.command("load-input-conf", f"memory://{INTERNAL_BINDINGS}")
-            self.mpv.command("load-input-conf", INPUT_CONF)
-        except Exception:
-            logger.exception("load-input-conf failed")
-
         self.bindings = cast(dict, self.mpv.input_bindings)
         self.mouse_bindings: dict = get_mouse_bindings(self.bindings)
         self.nonrepeat_keys, self.has_enter_binding, self.has_kp_enter_binding = (
@@ -271,9 +248,20 @@ class CineWindow(Adw.ApplicationWindow):
         )
 
         sync_mpv_with_settings(self)
+        startup_trace.mark("mpv configured")
+        self.cache_policy = CachePolicy(self)
+        from .preload import PreloadManager
 
-        if settings.get_boolean("save-session") and is_activate:
-            restore_last_playlist(self, self.app, self.mpv)
+        self.preload = PreloadManager(self)
+        self.app.cache_budget.add(self)  # type: ignore
+
+        if settings.get_boolean("save-session") and not self.app.isolated:
+            if is_activate:
+                restore_last_playlist(self, self.app, self.mpv)
+            if len(self.app.get_windows()) == 1:
+                from .checkpoint import SessionCheckpointer
+
+                self._checkpoint = SessionCheckpointer(self)
 
     def _setup_actions(self):
         self._create_action("clear-and-add", self._on_clear_and_add)
@@ -324,6 +312,8 @@ class CineWindow(Adw.ApplicationWindow):
         self._create_action("next", self.on_next_clicked)
 
     def _present_shortcuts(self, *args):
+        from .shortcuts import populate_shortcuts_dialog_mpv
+
         builder = Gtk.Builder.new_from_resource(
             "/io/github/diegopvlk/Cine/shortcuts-dialog.ui"
         )
@@ -335,6 +325,8 @@ class CineWindow(Adw.ApplicationWindow):
         self.shortcuts_dialog.present(self)
 
     def _present_history(self, *args):
+        from .history import HistoryDialog
+
         history_dialog = HistoryDialog(self)
         history_dialog.present(self)
 
@@ -484,6 +476,9 @@ class CineWindow(Adw.ApplicationWindow):
                 self._visible_dialog = None
             self.hide_ui_timeout()
 
+        self._connect("notify::is-active")(self.app.cache_budget.update)  # type: ignore
+        self._connect("notify::suspended")(self.app.cache_budget.update)  # type: ignore
+
         @self._connect("notify::is-active")
         def on_is_active_change(*args):
             if self.props.is_active:
@@ -536,7 +531,7 @@ class CineWindow(Adw.ApplicationWindow):
             if btn == self.open_menu_btn:
 
                 def on_popv_closed(*args):
-                    if is_same_playlist(self.mpv.playlist):
+                    if is_same_playlist(self):
                         self.mpv.write_watch_later_config()
 
                 popover.connect("closed", on_popv_closed)
@@ -724,8 +719,15 @@ class CineWindow(Adw.ApplicationWindow):
     def _on_open_playlist(self, *args):
         if self.mpv.idle_active:
             return
-        playlist = Playlist(self)
-        playlist.present(self)
+        from .playlist import Playlist
+
+        self.playlist_dialog = Playlist(self)
+        self.playlist_dialog.connect("closed", self._on_playlist_dialog_closed)
+        self.playlist_dialog.present(self)
+
+    def _on_playlist_dialog_closed(self, dialog):
+        if dialog is self.playlist_dialog:
+            self.playlist_dialog = None
 
     def on_open_folder_dialog(self, action, *args):
         add_mode = action.props.name != "open-folder"
@@ -801,8 +803,8 @@ class CineWindow(Adw.ApplicationWindow):
             lambda d, res: self._on_open_response(d, res, mode),
         )
 
-        if isinstance(self._visible_dialog, Playlist):
-            self._visible_dialog.spinner.set_visible(True)
+        if self.playlist_dialog:
+            self.playlist_dialog.spinner.set_visible(True)
 
     def _on_open_response(self, dialog, result, mode):
         try:
@@ -812,15 +814,16 @@ class CineWindow(Adw.ApplicationWindow):
                 self.mpv.stop()
                 self.shuffle_toggle_btn.set_active(False)
 
-            for file in files:
-                path = file.get_path() or file.get_uri()
+            paths = [file.get_path() or file.get_uri() for file in files]
 
-                if mode == "sub-add":
+            if mode == "sub-add":
+                for path in paths:
                     self.mpv.sub_add(path)
-                elif mode == "audio-add":
+            elif mode == "audio-add":
+                for path in paths:
                     self.mpv.audio_add(path)
-                else:
-                    self.mpv.loadfile(path, "append-play")
+            else:
+                self.enqueue(paths, "append-play")
 
             if mode == "clear-and-add":
                 self.mpv.pause = False
@@ -829,8 +832,8 @@ class CineWindow(Adw.ApplicationWindow):
         except Exception:
             logger.exception("Failed to add files")
         finally:
-            if isinstance(self._visible_dialog, Playlist):
-                self._visible_dialog.spinner.set_visible(False)
+            if self.playlist_dialog:
+                self.playlist_dialog.spinner.set_visible(False)
 
     def _on_open_sub_menu(self, *args):
         self._show_ui()
@@ -848,7 +851,7 @@ class CineWindow(Adw.ApplicationWindow):
 
     def _on_save_session(self, *args, close=False):
         settings.set_boolean("save-session", True)
-        save_last_playlist_file(self.mpv)
+        save_last_playlist_file(self)
         if close:
             self.close()
         else:
@@ -1191,7 +1194,7 @@ class CineWindow(Adw.ApplicationWindow):
 
         self.icon_indicator.props.icon_name = pause if paused else play
         self._show_icon_indicator()
-        self._mpris.update_playback_status(paused)
+        self._mpris.update_playback_status(self, paused)
 
     def _update_duration(self, duration):
         self.time_total_label.set_text(format_time(duration))
@@ -1222,6 +1225,7 @@ class CineWindow(Adw.ApplicationWindow):
         self.mpv.command_async("cycle", "pause")
 
     def _on_progress_pressed(self, *args):
+        self._prog_dragging = True
         try:
             self._playing_on_press = not self.mpv.pause
             if self._playing_on_press:
@@ -1232,6 +1236,8 @@ class CineWindow(Adw.ApplicationWindow):
             self._skip_obs_count = 0
 
     def _on_progress_released(self, *args):
+        self._prog_dragging = False
+        self.seek_to(self.video_progress_adj.props.value)
         try:
             if self._playing_on_press:
                 self._skip_obs_count += 1
@@ -1242,7 +1248,47 @@ class CineWindow(Adw.ApplicationWindow):
             self._skip_obs_count = 0
 
     def _on_progress_adjusted(self, adjustment):
-        self.mpv.command_async("seek", adjustment.props.value, "absolute")
+        self.seek_to(adjustment.props.value)
+
+    def seek_to(self, time):
+        """
+        Keeps only the latest target with one seek in flight,
+        keyframe seeks while dragging, exact otherwise.
+        """
+        flags = "absolute+keyframes" if self._prog_dragging else "absolute+exact"
+        self._seek_target = (time, flags)
+        self._flush_seek()
+
+    def _flush_seek(self):
+        if self._seek_in_flight or self._seek_target is None:
+            return
+
+        time, flags = self._seek_target
+        self._seek_target = None
+        self._seek_in_flight = True
+        self._seek_gen += 1
+        gen = self._seek_gen
+
+        def on_done(future):
+            if future.exception():
+                idle_add_once(self._on_seek_done)
+            else:
+                # unseekable streams only log "Cannot seek", nothing restarts
+                timeout_add_once(SEEK_RESTART_TIMEOUT_MS, self._on_seek_timeout, gen)
+
+        try:
+            self.mpv.command_async("seek", time, flags).add_done_callback(on_done)
+        except Exception:
+            logger.exception("_flush_seek failed")
+            self._seek_in_flight = False
+
+    def _on_seek_done(self):
+        self._seek_in_flight = False
+        self._flush_seek()
+
+    def _on_seek_timeout(self, gen):
+        if self._seek_in_flight and gen == self._seek_gen:
+            self._on_seek_done()
 
     @Gtk.Template.Callback()
     def _on_shuffle_toggled(self, button):
@@ -1254,8 +1300,7 @@ class CineWindow(Adw.ApplicationWindow):
         self._mpris.update_shuffle(active)
         self.prev_shuffle = not active
 
-        if isinstance(self._visible_dialog, Playlist):
-            idle_add_once(self.splice_playlist)
+        idle_add_once(self.splice_playlist)
 
     def _on_ab_loop_btn_toggled(self, button):
         if not button or not button.get_active():
@@ -1337,9 +1382,8 @@ class CineWindow(Adw.ApplicationWindow):
     def _on_drop(self, _target, value, _x, _y):
         self.revealer_drop_indicator.set_reveal_child(False)
         items: list[Gio.File] | list[str] = []
-        playable_items: list[str] = []
 
-        if is_same_playlist(self.mpv.playlist):
+        if is_same_playlist(self):
             self.mpv.write_watch_later_config()
 
         if isinstance(value, Gdk.FileList):
@@ -1347,45 +1391,19 @@ class CineWindow(Adw.ApplicationWindow):
         elif isinstance(value, str):
             items = [value]
 
-        for item in items:
-            if isinstance(item, str):
-                playable_items.append(item)
-                continue
-
-            path = item.get_path() or item.get_uri()
-            if not is_local_path(path):
-                playable_items.append(path)
-                continue
-
-            try:
-                info = item.query_info(
-                    "standard::content-type,standard::type",
-                    Gio.FileQueryInfoFlags.NONE,
-                    None,
-                )
-            except Exception as e:
-                logger.exception("Drop failed")
-                idle_add_once(self.show_toast, str(e))
-                return
-
-            name = (item.get_basename() or "").lower()
-            if name.endswith(SUB_EXTS):
-                if not self.mpv.idle_active:
-                    self.mpv.command_async("sub-add", path, "select")
-                continue
+        self.load_dropped(items)
 
-            mime = info.get_content_type() or ""
-            if info.get_file_type() == Gio.FileType.DIRECTORY or mime.startswith(
-                ("video/", "audio/", "image/")
-            ):
-                playable_items.append(path)
+    def load_dropped(self, items, first_mode="replace", spinner=None):
+        from .drop_loader import DropLoader
 
-        for idx, source in enumerate(playable_items):
-            mode = "replace" if idx == 0 else "append-play"
-            self.mpv.loadfile(source, mode)
+        if self._drop_loader:
+            self._drop_loader.cancel()
+        self._drop_loader = DropLoader(self, items, first_mode, spinner)
+        self._drop_loader.start()
 
-        if playable_items:
-            self.mpv.command_async("set", "pause", "no")
+    def on_drop_loaded(self, loader):
+        if loader is self._drop_loader:
+            self._drop_loader = None
 
     def _sync_fullscreen(self, mpv_is_fs: bool):
         self._is_fullscreen = mpv_is_fs
@@ -1708,7 +1726,7 @@ class CineWindow(Adw.ApplicationWindow):
 
     def do_close_request(self) -> bool:
         try:
-            same_playlist = is_same_playlist(self.mpv.playlist)
+            same_playlist = is_same_playlist(self)
             save_pos = settings.get_boolean("save-video-position")
             if same_playlist or save_pos:
                 self.mpv.quit_watch_later()
@@ -1718,34 +1736,334 @@ class CineWindow(Adw.ApplicationWindow):
         except mpv.ShutdownError:
             pass
 
+        self.app.cache_budget.remove(self)  # type: ignore
+
+        preload = self.preload.stats()
+        if transitions := preload["hits"] + preload["misses"]:
+            logger.info(
+                f"Preloaded {preload['hits']} of {transitions} transitions in time"
+            )
+
+        if self._drop_loader:
+            self._drop_loader.cancel()
+
+        if self._checkpoint:
+            self._checkpoint.close()
+
         if self._inhibit_cookie:
             self.app.uninhibit(self._inhibit_cookie)
 
         return False
 
+    def load_path(self, path, mode="append-play"):
+        """Like loadfile, but local playlist files are read by Cine in batches."""
+        self.enqueue((path,), mode)
+
+    def enqueue(self, paths, mode="append-play"):
+        """
+        Adds many paths to mpv in bulk, the playlist is synced once mpv is
+        done with them. Local playlist files are imported in between,
+        keeping the order.
+        """
+        from .playlist_io import import_playlist, is_playlist_file
+
+        paths = list(paths)
+        if mode == "replace":
+            # whatever was still being added would end up after the new files
+            self.cancel_restore()
+            self.cancel_bulk()
+
+        while paths:
+            if self._importing:
+                self._load_queue.append((paths, mode))
+                return
+
+            n = next((i for i, p in enumerate(paths) if is_playlist_file(p)), None)
+            run = paths if n is None else paths[:n]
+            if len(run) == 1:
+                self.mpv.loadfile(run[0], mode)
+            elif run:
+                self._loadfiles(run, mode)
+            if run and mode == "replace":
+                mode = "append-play"
+
+            if n is None:
+                return
+            self._importing = True
+            import_playlist(self, paths[n], mode, self._on_import_done)
+            if mode == "replace":
+                mode = "append-play"
+            paths = paths[n + 1 :]
+
+    def _loadfiles(self, paths, mode, index=None):
+        from .playlist_io import loadfile_commands
+
+        entries = [("", path, None) for path in paths]
+        self.run_bulk(loadfile_commands(entries, mode, index))
+
+    def insert_paths(self, paths, index):
+        """Inserts paths at index, playlist files are left for mpv to expand."""
+        if paths:
+            self._loadfiles(paths, "insert-at", index)
+
+    def run_bulk(self, commands):
+        """
+        Sends commands to mpv in order, BULK_CHUNK per main loop iteration,
+        after the runs queued before. The playlist is synced every
+        BULK_SPLICE_MS while they run and once at the end.
+        Returns a handle for cancel_bulk.
+        """
+        run = iter(commands)
+        self._bulk_queue.append(run)
+        self._bulk_pending += 1
+        # moves don't change playlist-count
+        self.playlist_changed = True
+        if not self._bulk_pump_id:
+            self._pump_bulk()
+        return run
+
+    @property
+    def bulk_loading(self):
+        """Commands from run_bulk are still being sent or processed."""
+        return self._bulk_pending > 0
+
+    def cancel_restore(self):
+        """Stops a session restore still adding items, files opened now win."""
+        self.restore_cancelled = True
+        if self.restore_run:
+            self.cancel_bulk(self.restore_run)
+            self.restore_run = None
+
+    def cancel_bulk(self, run=None):
+        """Drops what is left of a run from run_bulk, or of all runs."""
+        for queued in list(self._bulk_queue):
+            if run is None or queued is run:
+                if queued is self._bulk_queue[0]:
+                    self._bulk_last_future = None
+                self._bulk_queue.remove(queued)
+                idle_add_once(self._on_bulk_done)
+
+    def _pump_bulk(self):
+        self._bulk_pump_id = 0
+        sent = 0
+        while self._bulk_queue and sent < BULK_CHUNK:
+            run = self._bulk_queue[0]
+            args = next(run, None)
+            if args is None:
+                self._bulk_queue.popleft()
+                future, self._bulk_last_future = self._bulk_last_future, None
+                if future:
+                    future.add_done_callback(
+                        lambda _f: idle_add_once(self._on_bulk_done)
+                    )
+                else:
+                    idle_add_once(self._on_bulk_done)
+                continue
+
+            try:
+                self._bulk_last_future = self.mpv.command_async(*args)
+            except mpv.ShutdownError:
+                self._bulk_queue.clear()
+                return
+            sent += 1
+
+        if self._bulk_queue:
+            self._bulk_pump_id = idle_add_once(self._pump_bulk)
+
+    def _on_bulk_done(self):
+        self._bulk_pending = max(0, self._bulk_pending - 1)
+        if self._bulk_pending == 0:
+            if self._playlist_debounce_id > 0:
+                GLib.source_remove(self._playlist_debounce_id)
+            self.splice_playlist()
+            self._sync_can_prev_next()
+
+    def _on_import_done(self):
+        self._importing = False
+        queue, self._load_queue = self._load_queue, []
+        for paths, mode in queue:
+            self.enqueue(paths, mode)
+
+    def _index_media(self, objs):
+        """Fills duration/media info of local items, from cache or ffprobe."""
+        media_index = self.app.media_index  # type: ignore
+        for obj in objs:
+            path = obj.item["filename"]
+            if not is_local_path(path):
+                continue
+            if info := media_index.lookup(path):
+                obj.set_media_info(info)
+            else:
+                media_index.request(
+                    path, lambda info, o=obj: self.update_media_info(o, info)
+                )
+
+    def update_media_info(self, obj, info):
+        obj.set_media_info(info)
+        self.set_item_duration(obj, obj.duration)
+
+    def set_item_duration(self, obj, duration):
+        obj.duration = duration
+        # stale objs may still get late probe results
+        if self.playlist_by_id.get(obj.entry_id) is not obj:
+            return
+        self.duration_index.set(obj.position, duration)
+        if self.playlist_dialog and not self._info_refresh_id:
+            self._info_refresh_id = timeout_add_once(250, self._refresh_item_count)
+
+    def _refresh_item_count(self):
+        self._info_refresh_id = 0
+        if self.playlist_dialog:
+            self.playlist_dialog.set_item_count()
+
+    def flush_playlist(self):
+        """Syncs the model now if mpv's playlist changed since the last splice."""
+        if self._playlist_debounce_id > 0:
+            GLib.source_remove(self._playlist_debounce_id)
+            self._playlist_debounce_id = 0
+        elif not self.playlist_changed:
+            return
+        self.splice_playlist()
+
     def splice_playlist(self):
+        """Syncs playlist_ls with mpv, only the range that changed is replaced."""
         self._playlist_debounce_id = 0
-        self.has_some_doc_path = False
-        new_items = []
-        for idx, item in enumerate(cast(list, self.mpv.playlist)):
-            new_items.append(PlaylistItemObj(item, idx))
+        playlist = cast(list, self.mpv.playlist)
+        old_objs = self.playlist_objs
+        n_old, n_new = len(old_objs), len(playlist)
+
+        start = 0
+        n_min = min(n_old, n_new)
+        while start < n_min and old_objs[start].entry_id == playlist[start].get("id"):
+            start += 1
+
+        end_old, end_new = n_old, n_new
+        while (
+            end_old > start
+            and end_new > start
+            and old_objs[end_old - 1].entry_id == playlist[end_new - 1].get("id")
+        ):
+            end_old -= 1
+            end_new -= 1
+
+        removed = old_objs[start:end_old]
+        # moved and shuffled entries keep their object, info and duration
+        moved = {obj.entry_id: obj for obj in removed}
+        added, new = [], []
+        for i, item in enumerate(playlist[start:end_new]):
+            obj = moved.pop(item.get("id"), None)
+            if obj is None:
+                obj = PlaylistItemObj(item, start + i)
+                new.append(obj)
+            else:
+                obj.item = item
+                obj.position = start + i
+            added.append(obj)
+        if self.known_durations:
+            for obj in new:
+                obj.duration = self.known_durations.get(obj.item["filename"])
+            # only needed until the entries show up here
+            for obj in new:
+                self.known_durations.pop(obj.item["filename"], None)
+            if not playlist:
+                self.known_durations.clear()
+        self._index_media(new)
+        suffix = old_objs[end_old:]
+
+        if shift := end_new - end_old:
+            for obj in suffix:
+                obj.position += shift
+
+        self.playlist_fp.splice(
+            start,
+            [obj.path_hash for obj in removed],
+            [obj.path_hash for obj in added],
+            [obj.path_hash for obj in suffix] if end_new != end_old else [],
+        )
+        self.playlist_objs = old_objs[:start] + added + suffix
+        self.duration_index.splice(
+            start, len(removed), [obj.duration for obj in added], len(suffix)
+        )
 
-            if (
-                self.has_some_doc_path
-                or f"/run/user/{os.getuid()}/doc/" not in item.get("filename")
-                or has_host_permission
-            ):
-                continue
-            self.has_some_doc_path = True
+        for obj in removed:
+            self.playlist_by_id.pop(obj.entry_id, None)
+        for obj in added:
+            self.playlist_by_id[obj.entry_id] = obj
+
+        if not has_host_permission:
+            doc_dir = f"/run/user/{os.getuid()}/doc/"
+            self._doc_path_count += sum(doc_dir in o.item["filename"] for o in added)
+            self._doc_path_count -= sum(doc_dir in o.item["filename"] for o in removed)
+        self.has_some_doc_path = self._doc_path_count > 0
 
-        if isinstance(self._visible_dialog, Playlist):
-            self._visible_dialog.set_save_btn_playlist()
-            self._visible_dialog.set_item_count()
+        if removed or added:
+            self.playlist_ls.splice(start, len(removed), added)
+            self._mpris.update_tracks(self, start, removed, added)
+            if self._checkpoint:
+                self._checkpoint.record_splice(start, removed, added)
+
+        curr = next((i for i, item in enumerate(playlist) if item.get("current")), -1)
+        self._set_playing_obj(self.playlist_objs[curr] if curr >= 0 else None)
+        self._prefetch_urls()
+        self.preload.update()
+
+        if self.playlist_dialog:
+            self.playlist_dialog.set_save_btn_playlist()
+            self.playlist_dialog.set_item_count()
 
-        self.playlist_ls.splice(0, self.playlist_ls.get_n_items(), new_items)
         self.prev_shuffle = self.shuffle_toggle_btn.props.active
         self.playlist_changed = False
 
+    def _prefetch_urls(self):
+        """Resolves the next web URLs, so mpv can skip ytdl_hook when it gets there."""
+        from .url_resolver import URL_PREFETCH, needs_resolving
+
+        if not self._playing_obj:
+            return
+
+        pos = self._playing_obj.position
+        upcoming = [
+            obj.item["filename"].removeprefix("ytdl://")
+            for obj in self.playlist_objs[pos + 1 : pos + 1 + URL_PREFETCH]
+            if needs_resolving(obj.item["filename"])
+        ]
+        self._resolved_urls = {
+            url: entry for url, entry in self._resolved_urls.items() if url in upcoming
+        }
+        if not upcoming:
+            return
+
+        try:
+            if not self.mpv.ytdl:
+                return
+            ytdl_format = self.mpv["ytdl-format"]
+        except mpv.ShutdownError:
+            return
+
+        resolver = self.app.url_resolver  # type: ignore
+        for url in upcoming:
+            if url not in self._resolved_urls:
+                resolver.resolve(
+                    url, ytdl_format, lambda e, u=url: self._on_url_resolved(u, e)
+                )
+
+    def _on_url_resolved(self, url, entry):
+        self._resolved_urls[url] = entry
+        try:
+            data = json.dumps(self._resolved_urls)
+            self.mpv.command_async("set", "user-data/cine/resolved", data)
+        except mpv.ShutdownError:
+            pass
+
+    def _set_playing_obj(self, obj):
+        if obj is self._playing_obj:
+            return
+        if self._playing_obj:
+            self._playing_obj.playing = False
+        if obj:
+            obj.playing = True
+        self._playing_obj = obj
+
     def show_toast(self, label, force_dismiss=False):
         toast = Adw.Toast(title=label, timeout=2)
         self.toast_overlay.dismiss_all()
@@ -1773,6 +2091,9 @@ class CineWindow(Adw.ApplicationWindow):
                     self.thumb_area.unmap()
                     self.thumb_area = None
 
+                if self._playing_obj:
+                    self.set_item_duration(self._playing_obj, self.mpv.duration)
+
                 self._mpris.update_metadata()
             except mpv.ShutdownError:
                 pass
@@ -1782,8 +2103,15 @@ class CineWindow(Adw.ApplicationWindow):
             idle_add_once(on_f_loaded)
             timeout_add_seconds_once(5, setattr, self, "_error_count", 0)
 
+        @self.mpv.event_callback("playback-restart")
+        def on_playback_restart(_event):
+            idle_add_once(self._on_seek_done)
+            idle_add_once(self._mpris.set_clock_running, self, True)
+
         @self.mpv.event_callback("end-file")
         def on_end_file(event):
+            idle_add_once(self._on_seek_done)
+            idle_add_once(self._mpris.set_clock_running, self, False)
             idle_add_once(self.spinner.set_visible, False)
             idle_add_once(self.start_page.set_sensitive, True)
 
@@ -1823,24 +2151,30 @@ class CineWindow(Adw.ApplicationWindow):
         @self.mpv.property_observer("playlist-count")
         def on_playlist_count_change(_name, _count):
             self.playlist_changed = True
-            if isinstance(self._visible_dialog, Playlist):
-                if self._playlist_debounce_id > 0:
-                    GLib.source_remove(self._playlist_debounce_id)
-                    self._playlist_debounce_id = 0
-                self._playlist_debounce_id = timeout_add_once(75, self.splice_playlist)
+            if self._bulk_pending:
+                # not pushed back by each change, so the list fills as it goes
+                if not self._playlist_debounce_id:
+                    self._playlist_debounce_id = timeout_add_once(
+                        BULK_SPLICE_MS, self.splice_playlist
+                    )
+                return
+            # kept in sync even without the dialog, MPRIS TrackList uses it
+            if self._playlist_debounce_id > 0:
+                GLib.source_remove(self._playlist_debounce_id)
+                self._playlist_debounce_id = 0
+            self._playlist_debounce_id = timeout_add_once(75, self.splice_playlist)
             idle_add_once(self._sync_can_prev_next)
 
         def update_playing_item(pos):
             try:
-                prev_p = self._playlist_prev_pos
-                prev_obj = cast(PlaylistItemObj, self.playlist_ls.get_item(prev_p))
-                curr_obj = cast(PlaylistItemObj, self.playlist_ls.get_item(pos))
-                prev_obj.playing = False
-                curr_obj.playing = True
-            except (AttributeError, OverflowError):
-                pass
-            finally:
-                self._playlist_prev_pos = pos
+                obj = self.playlist_ls.get_item(pos) if pos is not None else None
+            except OverflowError:
+                obj = None
+            self._set_playing_obj(obj)
+            self._prefetch_urls()
+            self.preload.update()
+            if self.playlist_dialog:
+                self.playlist_dialog.set_item_count()
 
         @self.mpv.property_observer("playlist-pos")
         def on_playlist_pos_changed(_name, pos):
@@ -1929,14 +2263,23 @@ class CineWindow(Adw.ApplicationWindow):
             idle_add_once(sync_fs, value)
             self.hide_ui_timeout()
 
+        def sync_time_pos(value):
+            self._update_progress(value)
+            self._mpris.update_position(self, value)
+            if self.playlist_dialog:
+                self.playlist_dialog.update_time_left(value)
+
         @self.mpv.property_observer("time-pos")
         def on_time_change(_name, value):
-            idle_add_once(self._update_progress, float(value or 0))
+            idle_add_once(sync_time_pos, float(value or 0))
 
-        @self.mpv.property_observer("seeking")
-        def on_seeking_change(_name, seeking):
-            if not seeking:
-                idle_add_once(self._mpris.emit_seeked)
+        @self.mpv.property_observer("paused-for-cache")
+        def on_paused_for_cache(_name, value):
+            idle_add_once(self._mpris.set_clock_running, self, not value)
+
+        @self.mpv.property_observer("speed")
+        def on_speed_change(_name, value):
+            idle_add_once(self._mpris.update_rate, self, float(value or 1))
 
         @self.mpv.property_observer("duration")
         def on_duration_change(_name, value):
@@ -2030,6 +2373,7 @@ class CineWindow(Adw.ApplicationWindow):
                 self.mpv.seek(0, reference="absolute")
 
             idle_add_once(self._sync_inhibit)
+            idle_add_once(self.app.cache_budget.update)  # type: ignore
             self._update_play_pause_icon(paused)
 
         def sync_idle_active(is_idle):
@@ -2055,8 +2399,8 @@ class CineWindow(Adw.ApplicationWindow):
                 self.revealer_ui.set_reveal_child(True)
                 self.set_title(_("Cine"))
                 self._hide_icon_indicator = True
-                if isinstance(self._visible_dialog, Playlist):
-                    self._visible_dialog.close()
+                if self.playlist_dialog:
+                    self.playlist_dialog.close()
 
             self._sync_inhibit()
 
@@ -2064,6 +2408,9 @@ class CineWindow(Adw.ApplicationWindow):
         def on_idle_change(_name, is_idle):
             self._is_startup = False
             idle_add_once(sync_idle_active, is_idle)
+            if is_idle:
+                idle_add_once(self._mpris.set_clock_running, self, False)
+            idle_add_once(self.app.cache_budget.update)  # type: ignore
 
         def sync_title(title):
             try: